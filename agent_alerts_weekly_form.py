@@ -1,30 +1,74 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 import os
 import json
+import orjson
 import requests
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from dateutil.parser import parse
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-import pytz
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import logging
 import time
+import atexit
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+from urllib3.util.retry import Retry
 
 app = Flask(__name__)
 
 # ========== LOGGING SETUP ==========
+# Request threads only enqueue records; a QueueListener thread does the file/stream writes
+log_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+log_handlers = [logging.FileHandler("app.log"), logging.StreamHandler()]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Records already carry %(asctime)s, so messages don't add their own timestamps.
+# Set LOG_LEVEL=WARNING in production to drop the per-request INFO lines.
+# The QueueHandler must pass the bare message through; log_formatter on the listener adds the prefix
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(message)s",
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+class LazyJson:
+    """Log argument that only runs orjson.dumps (indented) if the record is actually emitted."""
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return orjson.dumps(self.data, default=str, option=orjson.OPT_INDENT_2).decode()
+
+class LazyEtTime:
+    """Log argument that converts a timestamp to an ET ISO string on first emit, then reuses it."""
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self.timestamp.astimezone(ET).isoformat()
+        return self._text
+
+def _json_response(obj, status=200):
+    """Serialize obj with orjson into a JSON Flask response."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype="application/json")
+
 # ========== ENV VARS VALIDATION ==========
 required_env_vars = [
     "SLACK_BOT_TOKEN", "ALERT_CHANNEL_ID", "WEEKLY_UPDATE_SHEET_ID",
@@ -76,101 +120,205 @@ if not GOOGLE_SERVICE_ACCOUNT_JSON or not isinstance(GOOGLE_SERVICE_ACCOUNT_JSON
     logger.warning("Invalid Google service account credentials")
     GOOGLE_SERVICE_ACCOUNT_JSON = {}
 
-# Dictionary to store sheets_service instances for each year and type
-sheets_services = {
-    "weekly_update": {},
-    "followup": {}
+# Build the service-account credentials once; they're reused by every Sheets service
+GOOGLE_CREDENTIALS = None
+try:
+    GOOGLE_CREDENTIALS = service_account.Credentials.from_service_account_info(GOOGLE_SERVICE_ACCOUNT_JSON, scopes=SCOPES)
+except Exception as e:
+    logger.error(f"Failed to load Google service account credentials: {e}")
+
+# Spreadsheet IDs per sheet type and year; every spreadsheet is reached through one shared sheets_service
+SPREADSHEET_IDS = {
+    "weekly_update": WEEKLY_UPDATE_SPREADSHEET_IDS,
+    "followup": FOLLOWUP_SPREADSHEET_IDS
 }
+shared_sheets_service = None
+SHEETS_HTTP_TIMEOUT = 8  # seconds
 
 # Dictionary to store the current Presence State and timestamp for each agent
 agent_presence_states = {}
 
-# Dictionary to track the last alert sent for each agent and state (for deduplication)
-last_alerts = {}
+# Epoch seconds of the last alert sent for each (agent, state) pair (for deduplication), oldest first
+last_alerts = OrderedDict()
+LAST_ALERTS_MAX = 1000
+ALERT_DEDUP_SECONDS = 5 * 60
+# Alert posts finish on background threads, so claim/restore of a last_alerts slot happens under this lock
+last_alerts_lock = threading.Lock()
 
-# Dictionary to track the timestamp when each agent entered a specific state
-agent_state_timestamps = {}
+# Dictionary to track the timestamp when each agent entered a specific state: {agent: {state: timestamp}}.
+# Agents are checked against AGENTS before anything is stored, so this stays bounded by agents x states.
+agent_state_timestamps = defaultdict(dict)
 
-ET = pytz.timezone('America/New_York')
-logger.info(f"Initialized agent_presence_states as empty dictionary at startup: {datetime.utcnow().replace(tzinfo=pytz.UTC).astimezone(ET).isoformat()}")
+UTC = timezone.utc
+ET = ZoneInfo('America/New_York')
+logger.info(f"Initialized agent_presence_states as empty dictionary at startup: {datetime.now(ET).isoformat()}")
 
 def get_sheets_service(year, sheet_type="followup"):
-    """Get or create a sheets_service instance for the given year and sheet type."""
-    if sheet_type not in sheets_services:
+    """Return the shared sheets_service and the spreadsheet ID for the given year and sheet type."""
+    global shared_sheets_service
+    spreadsheet_ids = SPREADSHEET_IDS.get(sheet_type)
+    if spreadsheet_ids is None:
         logger.error(f"Invalid sheet type {sheet_type}")
         return None
 
-    if year not in sheets_services[sheet_type]:
-        if sheet_type == "weekly_update":
-            spreadsheet_id = WEEKLY_UPDATE_SPREADSHEET_IDS.get(year)
-        elif sheet_type == "followup":
-            spreadsheet_id = FOLLOWUP_SPREADSHEET_IDS.get(year)
-        else:
-            logger.error(f"Unknown sheet type {sheet_type}")
-            return None
+    spreadsheet_id = spreadsheet_ids.get(year)
+    if not spreadsheet_id:
+        logger.error(f"No spreadsheet ID defined for year {year} and type {sheet_type}")
+        return None
 
-        if not spreadsheet_id:
-            logger.error(f"No spreadsheet ID defined for year {year} and type {sheet_type}")
+    if shared_sheets_service is None:
+        if GOOGLE_CREDENTIALS is None:
+            logger.error(f"Google credentials unavailable, cannot initialize Sheets for year {year} and type {sheet_type}")
             return None
-
         try:
-            creds = service_account.Credentials.from_service_account_info(GOOGLE_SERVICE_ACCOUNT_JSON, scopes=SCOPES)
-            sheets_service = build("sheets", "v4", credentials=creds)
-            sheets_services[sheet_type][year] = (sheets_service, spreadsheet_id)
-            logger.info(f"Initialized Google Sheets service for year {year} and type {sheet_type}")
+            # The bundled static discovery doc is the same for every spreadsheet, so build the client once
+            # Bounded socket timeout so a stalled Sheets call can't hold sheets_lock (and the flusher) indefinitely
+            authorized_http = AuthorizedHttp(GOOGLE_CREDENTIALS, http=httplib2.Http(timeout=SHEETS_HTTP_TIMEOUT))
+            shared_sheets_service = build("sheets", "v4", http=authorized_http, cache_discovery=False, static_discovery=True)
+            logger.info("Initialized shared Google Sheets service")
         except Exception as e:
             logger.error(f"Failed to initialize Google Sheets for year {year} and type {sheet_type}: {e}")
             return None
 
-    return sheets_services[sheet_type][year]
+    return shared_sheets_service, spreadsheet_id
 
 # ========== SLACK ==========
-headers = {
+# Keep-alive pool for Slack API calls. The adapter only retries failed connects, where the request never
+# reached Slack; chat.postMessage isn't idempotent, so read timeouts and 5xx are not resent here, and
+# post_slack_message handles 429 itself.
+session = requests.Session()
+retries = Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.2, raise_on_status=False)
+session.mount("https://slack.com/", HTTPAdapter(max_retries=retries, pool_connections=10, pool_maxsize=50, pool_block=False))
+session.headers.update({
     "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-    "Content-Type": "application/json"
-}
+    "Content-Type": "application/json; charset=utf-8"
+})
+# (connect, read) timeouts in seconds so a stalled Slack call can't hang a worker
+SLACK_TIMEOUT = (2, 5)
+
+# Background pool for Slack/Sheets work whose result the request doesn't need (error-channel notices,
+# follow-up logging), so responses aren't held up by extra round-trips. Python joins its workers at exit.
+background_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="slack")
+
+class RateLimiter:
+    """Keep calls to one API at least `interval` seconds apart; the spacing widens after a 429 and eases back on success."""
+    def __init__(self, interval, max_interval=30):
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max_interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Reserve the next free slot under the lock, then wait for it outside so throttled()/succeeded() never block
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._last + self.interval)
+            self._last = slot
+        if slot > now:
+            time.sleep(slot - now)
+
+    def throttled(self):
+        with self._lock:
+            self.interval = min(self.interval * 2, self.max_interval)
+
+    def succeeded(self):
+        with self._lock:
+            self.interval = max(self.interval * 0.9, self.base_interval)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
 
-# Setup retry strategy for Slack API calls
-session = requests.Session()
-retries = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-session.mount('https://', HTTPAdapter(max_retries=retries))
+# chat.postMessage allows about one message per second per channel; cap in-flight posts so a burst can't fan out
+slack_limiter = RateLimiter(1.0)
+slack_sem = threading.Semaphore(4)
+
+# Vonage events are handled on a single worker so per-agent state transitions apply in arrival order
+vonage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vonage")
+
+# (event_type, subject, time) -> monotonic expiry, for dropping Vonage webhook redeliveries
+recent_vonage_events = {}
+recent_vonage_events_lock = threading.Lock()
+VONAGE_EVENT_DEDUP_TTL = 600  # seconds
+
+def is_duplicate_vonage_event(event_key):
+    """Record a Vonage event key and report whether it was already seen within the TTL."""
+    now = time.monotonic()
+    with recent_vonage_events_lock:
+        if len(recent_vonage_events) > 10000:
+            for key in [k for k, expiry in recent_vonage_events.items() if expiry <= now]:
+                del recent_vonage_events[key]
+        expiry = recent_vonage_events.get(event_key)
+        if expiry is not None and expiry > now:
+            return True
+        recent_vonage_events[event_key] = now + VONAGE_EVENT_DEDUP_TTL
+        return False
+
+def post_bot_error(message):
+    """Send a plain-text notice to the bot error channel without waiting on Slack."""
+    payload = {"channel": BOT_ERROR_CHANNEL_ID, "text": f"⚠️ {message}"}
+    try:
+        background_executor.submit(_post_bot_error, payload)
+    except RuntimeError:
+        # background_executor is already shut down (interpreter exit); the caller has logged the error itself
+        logger.warning(f"Bot error notice not sent during shutdown: {message}")
+
+def _post_bot_error(payload):
+    # Runs on background_executor, whose futures are never read; log failures here since nothing else will
+    try:
+        with slack_sem, slack_limiter:
+            response = session.post("https://slack.com/api/chat.postMessage", data=orjson.dumps(payload), timeout=SLACK_TIMEOUT)
+        if response.status_code != 200 or not orjson.loads(response.content).get("ok"):
+            logger.error(f"Failed to post bot error notice: HTTP {response.status_code}, {response.text}. Notice: {payload['text']}")
+    except Exception as e:
+        logger.error(f"Failed to post bot error notice: {e}. Notice: {payload['text']}")
+
+def warning_blocks(message):
+    """Single-section "⚠️ message" blocks, the shape of every user-facing failure notice."""
+    return [{"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ {message}"}}]
+
+FOLLOWUP_PARSE_ERROR_BLOCKS = warning_blocks("Error processing follow-up request. Please try again.")
 
 def post_slack_message(channel, blocks, thread_ts=None, retry_count=5):
-    """Post a message to Slack with retry logic for rate-limiting."""
-    current_time_et = datetime.utcnow().replace(tzinfo=pytz.UTC).astimezone(ET)
-    logger.info(f"Attempting to post to Slack channel: {channel} at {current_time_et.isoformat()}")
+    """Post a message to Slack, retrying rate limits only; connect failures are retried by the session adapter."""
+    logger.info(f"Attempting to post to Slack channel: {channel}")
     payload = {"channel": channel, "blocks": blocks}
     if thread_ts:
         payload["thread_ts"] = thread_ts
 
     for attempt in range(retry_count):
         try:
-            response = session.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
-            logger.info(f"Slack API response status: {response.status_code}")
-            logger.info(f"Slack API response: {response.text}")
-            if response.status_code == 429:
+            with slack_sem, slack_limiter:
+                response = session.post("https://slack.com/api/chat.postMessage", data=orjson.dumps(payload), timeout=SLACK_TIMEOUT)
+            logger.info("Slack API response status: %s", response.status_code)
+            logger.debug("Slack API response: %s", response.text)
+            if response.status_code == 429 and attempt < retry_count - 1:
                 retry_after = int(response.headers.get("Retry-After", 1))
                 logger.warning(f"Rate-limited by Slack, retrying after {retry_after} seconds")
+                slack_limiter.throttled()
                 time.sleep(retry_after)
                 continue
             if response.status_code != 200:
                 logger.error(f"Failed to post to Slack: {response.status_code} - {response.text}")
-                error_blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to post to Slack channel {channel}: {response.status_code} - {response.text}"}}
-                ]
-                session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
+                post_bot_error(f"Failed to post to Slack channel {channel}: {response.status_code} - {response.text}")
                 return None
+            result = orjson.loads(response.content)
+            # Slack reports rejected messages (channel_not_found, invalid_blocks, ...) as 200 with ok=false; retrying can't help
+            if not result.get("ok"):
+                logger.error(f"Slack rejected message to {channel}: {result.get('error')}")
+                post_bot_error(f"Failed to post to Slack channel {channel}: {result.get('error')}")
+                return None
+            slack_limiter.succeeded()
             logger.info("Successfully posted to Slack")
-            return response.json().get("ts")
+            return result.get("ts")
         except Exception as e:
+            # A read timeout may mean Slack already posted the message, so transport errors aren't resent
             logger.error(f"ERROR: Failed to post to Slack: {e}")
-            if attempt < retry_count - 1:
-                time.sleep(2 ** attempt)
-                continue
-            error_blocks = [
-                {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to post to Slack channel {channel}: {str(e)}"}}
-            ]
-            session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
+            post_bot_error(f"Failed to post to Slack channel {channel}: {str(e)}")
             return None
 
 # ========== EMPLOYEE OPTIONS FOR MULTI-SELECT ==========
@@ -196,6 +344,9 @@ employee_options = [
     {"text": {"type": "plain_text", "text": "Rebecca Stokes"}, "value": "1057"}
 ]
 
+# Multi-select option value (employee ID) -> display name, for sheet rows and summaries
+EMPLOYEE_NAMES = {option["value"]: option["text"]["text"] for option in employee_options}
+
 # Agent teams - Jessica Lopez moved to Team Adriana
 agent_teams = {
     "Carla Hagerman": "Team Adriana 💎",
@@ -239,15 +390,16 @@ CAMPAIGN_MAPPING = {
     "+13132179387": "LA Fire Incoming Calls"
 }
 
+# CAMPAIGN_MAPPING keyed by number without the leading "+", built once for direct lookups
+_CAMPAIGN_BY_NORMALIZED = {}
+for _number, _campaign in CAMPAIGN_MAPPING.items():
+    _CAMPAIGN_BY_NORMALIZED.setdefault(_number.lstrip("+"), _campaign)
+
 def get_campaign_from_number(phone_number):
     """Map a Vonage phone number to a campaign name (fallback method)."""
     if not phone_number:
         return "Unknown Campaign"
-    normalized_number = phone_number.lstrip("+")
-    for key, campaign in CAMPAIGN_MAPPING.items():
-        if normalized_number == key.lstrip("+") or phone_number == key:
-            return campaign
-    return "Unknown Campaign"
+    return _CAMPAIGN_BY_NORMALIZED.get(phone_number.lstrip("+"), "Unknown Campaign")
 
 # ========== SHIFT DETAILS ==========
 agent_shifts = {
@@ -454,26 +606,67 @@ agent_shifts = {
 }
 
 # ========== TIMEZONE HANDLING ==========
-def is_within_shift(agent, timestamp):
-    try:
-        agent_data = agent_shifts.get(agent)
-        if not agent_data:
-            logger.warning(f"Agent {agent} not found in shift data")
-            return False
+WEEKDAY_INDEX = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+WEEK_MASK = (1 << MINUTES_PER_WEEK) - 1
+
+def parse_shift_hour(hour_str):
+    """Convert a shift boundary like '11am', '7pm' or '12am' to an hour of the day (0-23)."""
+    hour = int(hour_str[:-2]) % 12
+    return hour + 12 if hour_str.lower().endswith("pm") else hour
+
+def build_shift_table(shifts_by_agent):
+    """Precompute {agent: (tz, shift_mask)}, where bit n of shift_mask is set if minute n of the local week is in shift."""
+    table = {}
+    for agent, agent_data in shifts_by_agent.items():
         try:
-            tz = pytz.timezone(agent_data["timezone"])
-        except pytz.exceptions.UnknownTimeZoneError as e:
+            tz = ZoneInfo(agent_data["timezone"])
+        except (ZoneInfoNotFoundError, ValueError) as e:
             logger.error(f"Invalid timezone for agent {agent}: {agent_data['timezone']}. Error: {e}")
-            return False
-        local_time = timestamp.astimezone(tz)
-        day = local_time.strftime("%a")
-        shift = agent_data["shifts"].get(day)
-        if not shift:
-            return False
-        start_str, end_str = shift
-        start_time = tz.localize(datetime.strptime(f"{local_time.date()} {start_str}", "%Y-%m-%d %I%p"))
-        end_time = tz.localize(datetime.strptime(f"{local_time.date()} {end_str}", "%Y-%m-%d %I%p"))
-        return start_time <= local_time <= end_time
+            continue
+        shift_mask = 0
+        for day, (start_str, end_str) in agent_data["shifts"].items():
+            start_minute = parse_shift_hour(start_str) * 60
+            end_minute = parse_shift_hour(end_str) * 60
+            if end_minute == 0:
+                end_minute = MINUTES_PER_DAY - 1  # A shift ending at 12am runs until midnight
+            # The end minute itself still counts as in shift (e.g. 7:00pm for a shift ending at 7pm);
+            # an overnight shift (e.g. 10pm-6am) runs into the next day, and Sunday night wraps to Monday morning
+            shift_length = (end_minute - start_minute) % MINUTES_PER_DAY + 1
+            day_offset = WEEKDAY_INDEX[day] * MINUTES_PER_DAY
+            shift_bits = ((1 << shift_length) - 1) << (day_offset + start_minute)
+            shift_mask |= (shift_bits & WEEK_MASK) | (shift_bits >> MINUTES_PER_WEEK)
+        table[agent] = (tz, shift_mask)
+    return table
+
+# Everything the webhook needs about an agent, so one lookup replaces separate team/shift dict probes
+AgentInfo = namedtuple("AgentInfo", ["name", "team", "tz", "shift_mask"])
+
+def build_agent_table():
+    """Combine agent_teams and agent_shifts into a single {agent: AgentInfo} table."""
+    shift_table = build_shift_table(agent_shifts)
+    return {
+        agent: AgentInfo(agent, agent_teams.get(agent, "Unknown Team"), *shift_table.get(agent, (None, 0)))
+        for agent in agent_shifts
+    }
+
+AGENTS = build_agent_table()
+
+@lru_cache(maxsize=4096)
+def _in_shift_for_minute(agent, epoch_minute):
+    """Shift check for one agent and one UTC minute; agents emit bursts of events within the same minute."""
+    agent_info = AGENTS.get(agent)
+    if not agent_info or agent_info.tz is None:
+        logger.warning(f"Agent {agent} not found in shift data")
+        return False
+    local_time = datetime.fromtimestamp(epoch_minute * 60, agent_info.tz)
+    minute_of_week = local_time.weekday() * MINUTES_PER_DAY + local_time.hour * 60 + local_time.minute
+    return bool((agent_info.shift_mask >> minute_of_week) & 1)
+
+def is_within_shift(agent, timestamp):
+    try:
+        return _in_shift_for_minute(agent, int(timestamp.timestamp() // 60))
     except Exception as e:
         logger.error(f"ERROR in is_within_shift for agent {agent}: {e}")
         return False
@@ -482,56 +675,201 @@ def is_within_shift(agent, timestamp):
 def get_event_duration(agent, current_state, current_timestamp):
     """Calculate duration in minutes since the agent entered the current state."""
     try:
-        state_key = f"{agent}:{current_state}"
-        if state_key not in agent_state_timestamps:
-            logger.info(f"Agent {agent} has no recorded timestamp for state {current_state}")
+        start_timestamp = agent_state_timestamps[agent].get(current_state)
+        if start_timestamp is None:
+            logger.info("Agent %s has no recorded timestamp for state %s", agent, current_state)
             return 0
 
-        start_timestamp = agent_state_timestamps[state_key]
         duration_seconds = (current_timestamp - start_timestamp).total_seconds()
         duration_min = duration_seconds / 60  # Convert seconds to minutes
-        logger.info(f"Calculated duration for {agent} in state {current_state}: {duration_min:.2f} minutes")
+        logger.info("Calculated duration for %s in state %s: %.2f minutes", agent, current_state, duration_min)
         return duration_min
     except Exception as e:
         logger.error(f"ERROR in get_event_duration for agent {agent}: {e}")
         return 0
 
+def parse_event_timestamp(timestamp_str):
+    """Parse a Vonage ISO-8601 timestamp to an aware UTC datetime, falling back to dateutil for odd formats."""
+    try:
+        timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+    except ValueError:
+        timestamp = parse(timestamp_str)
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=UTC)
+    return timestamp.astimezone(UTC)
+
 # ========== WEEKLY TAB HELPER ==========
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+def format_month_day(day):
+    """Format a date as 'Apr 7' without strftime (and its non-portable %-d)."""
+    return f"{_MONTHS[day.month - 1]} {day.day}"
+
+def parse_picker_date(date_str):
+    """Parse a Slack datepicker value, which is always YYYY-MM-DD."""
+    return date(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+
+@lru_cache(maxsize=64)
+def _weekly_tab_for_ordinal(ordinal):
+    """Build the tab name for the Monday-Sunday week containing a date, keyed by its ordinal."""
+    day = date.fromordinal(ordinal)
+    monday = day - timedelta(days=day.weekday())
+    sunday = monday + timedelta(days=6)
+    return f"Weekly {format_month_day(monday)} - {format_month_day(sunday)}"
+
 def get_weekly_tab_name(timestamp):
     """Determine the weekly tab name (e.g., 'Weekly Apr 1 - Apr 7') based on the timestamp."""
     try:
-        date = timestamp.date()
-        days_to_monday = (date.weekday() - 0) % 7
-        monday = date - timedelta(days=days_to_monday)
-        sunday = monday + timedelta(days=6)
-        tab_name = f"Weekly {monday.strftime('%b %-d')} - {sunday.strftime('%b %-d')}"
-        return tab_name
+        return _weekly_tab_for_ordinal(timestamp.toordinal())
     except Exception as e:
         logger.error(f"ERROR in get_weekly_tab_name: {e}")
         return "Weekly Unknown"
 
 # ========== GOOGLE SHEETS HELPER ==========
+# The Sheets client (httplib2) isn't thread-safe, and rows are now written from the flusher thread too
+sheets_lock = threading.RLock()
+# Stay under the per-user Sheets quota (60 requests/minute); every call already runs under sheets_lock
+sheets_limiter = RateLimiter(1.0)
+
+# Tab titles per spreadsheet_id, fetched on first use and kept current as tabs are created, so a new
+# weekly tab costs no lookup. Only touched under sheets_lock.
+_known_tabs = {}
+
+@lru_cache(maxsize=128)
+def sheet_range(sheet_name):
+    """A1 range for a tab; tab names repeat for a whole week, so the quoted string is built once per tab."""
+    return f"'{sheet_name}'!A1"
+
 def get_or_create_sheet_with_headers(service, spreadsheet_id, sheet_name, headers):
     try:
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        sheets = [s['properties']['title'] for s in spreadsheet['sheets']]
-        if sheet_name not in sheets:
-            requests_body = [{'addSheet': {'properties': {'title': sheet_name}}}]
-            service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={'requests': requests_body}).execute()
-            body = {"values": [headers]}
-            service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=f"'{sheet_name}'!A1",
-                valueInputOption="RAW",
-                body=body
-            ).execute()
+        with sheets_lock:
+            known_tabs = _known_tabs.get(spreadsheet_id)
+            if known_tabs is None:
+                sheets_limiter.acquire()
+                spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id, fields="sheets.properties.title").execute()
+                known_tabs = _known_tabs[spreadsheet_id] = {s['properties']['title'] for s in spreadsheet['sheets']}
+            if sheet_name not in known_tabs:
+                # Pick the new tab's sheetId up front so the header write can target it in the same batchUpdate;
+                # the tab and its header row then appear together or not at all
+                sheet_id = random.randrange(1, 2 ** 31)
+                requests_body = [
+                    {'addSheet': {'properties': {'sheetId': sheet_id, 'title': sheet_name}}},
+                    {'updateCells': {
+                        'start': {'sheetId': sheet_id, 'rowIndex': 0, 'columnIndex': 0},
+                        'rows': [{'values': [{'userEnteredValue': {'stringValue': header}} for header in headers]}],
+                        'fields': 'userEnteredValue'
+                    }}
+                ]
+                sheets_limiter.acquire()
+                service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={'requests': requests_body}).execute()
+                known_tabs.add(sheet_name)
         return sheet_name
     except Exception as e:
         logger.error(f"Error creating sheet {sheet_name} with headers: {e}")
+        with sheets_lock:
+            _known_tabs.pop(spreadsheet_id, None)
         return sheet_name
 
+# ========== BUFFERED SHEETS WRITES ==========
+# Rows waiting to be appended, keyed by (spreadsheet_id, sheet_name) -> (sheets_service, headers, rows)
+pending_rows = {}
+pending_rows_lock = threading.Lock()
+sheets_flush_event = threading.Event()
+SHEETS_FLUSH_INTERVAL = 5  # seconds
+SHEETS_FLUSH_MAX_ROWS = 50
+# Flushes a tab's rows may fail in a row before they are dropped; (spreadsheet_id, sheet_name) -> failures so far
+SHEETS_FLUSH_MAX_ATTEMPTS = 3
+flush_failures = {}
+
+def queue_sheet_rows(sheets_service, spreadsheet_id, sheet_name, headers, rows):
+    """Buffer rows for a tab; the flusher creates the tab if needed and appends its rows in a single Sheets call."""
+    with pending_rows_lock:
+        _, _, tab_rows = pending_rows.setdefault((spreadsheet_id, sheet_name), (sheets_service, headers, []))
+        tab_rows.extend(rows)
+        pending_count = sum(len(queued) for _, _, queued in pending_rows.values())
+    if pending_count >= SHEETS_FLUSH_MAX_ROWS:
+        sheets_flush_event.set()
+
+def flush_pending_rows(final=False):
+    """Append all buffered rows, one values().append call per tab; rows of a failed append go back in the buffer."""
+    with pending_rows_lock:
+        batches = dict(pending_rows)
+        pending_rows.clear()
+
+    for tab_key, (sheets_service, headers, rows) in batches.items():
+        spreadsheet_id, sheet_name = tab_key
+        try:
+            get_or_create_sheet_with_headers(sheets_service, spreadsheet_id, sheet_name, headers)
+            with sheets_lock, sheets_limiter:
+                sheets_service.spreadsheets().values().append(
+                    spreadsheetId=spreadsheet_id,
+                    range=sheet_range(sheet_name),
+                    valueInputOption="USER_ENTERED",
+                    body={"values": rows}
+                ).execute()
+            flush_failures.pop(tab_key, None)
+            logger.info(f"Flushed {len(rows)} row(s) to {sheet_name} tab")
+        except Exception as e:
+            # Tabs may have been deleted, renamed or added by hand; fetch the spreadsheet's tab list again on the next write
+            with sheets_lock:
+                _known_tabs.pop(spreadsheet_id, None)
+            failures = flush_failures.get(tab_key, 0) + 1
+            if final or failures >= SHEETS_FLUSH_MAX_ATTEMPTS:
+                # Out of attempts (or shutting down, when background_executor can't take the notice): log the rows so they can be re-entered
+                flush_failures.pop(tab_key, None)
+                logger.error(f"Dropping {len(rows)} row(s) for {sheet_name} tab after {failures} failed flush(es): {e}. Rows: {rows}")
+                if not final:
+                    post_bot_error(f"Failed to log {len(rows)} row(s) to Google Sheets (sheet: {sheet_name}): {str(e)}")
+                continue
+            flush_failures[tab_key] = failures
+            logger.error(f"Failed to flush {len(rows)} row(s) to {sheet_name} tab (attempt {failures}), will retry: {e}")
+            # Put the rows back ahead of anything queued since, so they keep their order
+            with pending_rows_lock:
+                _, _, tab_rows = pending_rows.setdefault(tab_key, (sheets_service, headers, []))
+                tab_rows[:0] = rows
+
+def sheets_flush_loop():
+    """Flush buffered rows every SHEETS_FLUSH_INTERVAL seconds, or sooner once the buffer fills up."""
+    while True:
+        sheets_flush_event.wait(SHEETS_FLUSH_INTERVAL)
+        sheets_flush_event.clear()
+        try:
+            flush_pending_rows()
+        except Exception as e:
+            logger.error(f"ERROR in sheets_flush_loop: {e}")
+
+threading.Thread(target=sheets_flush_loop, name="sheets-flush", daemon=True).start()
+atexit.register(flush_pending_rows, final=True)
+
 # ========== LOGGING TO WEEKLY TAB IN FOLLOWUPS SPREADSHEET ==========
+# States whose rows carry a real interaction ID and campaign
+STATES_WITH_INTERACTION = frozenset({"Busy", "Wrap", "Outgoing Wrap Up"})
+
+# Header row written to every new weekly follow-up tab
+FOLLOWUP_HEADERS = (
+    "Timestamp", "Agent Name", "Agent State", "Duration (min)", "Interaction ID",
+    "Campaign", "Team", "Assigned To (Lead)", "Monitoring Method",
+    "Follow-Up Action", "Reason for Issue", "Additional Notes", "Approval Decision", "Approved By (Slack)", "Status"
+)
+
+def build_followup_row(agent, timestamp, duration_min, interaction_id, agent_state, campaign, user=None, monitoring=None, action=None, reason=None, notes=None, approval_decision=None, approved_by=None, status="Open"):
+    """Build one follow-up sheet row, with the timestamp shown in ET."""
+    agent_info = AGENTS.get(agent)
+    team = agent_info.team if agent_info else "Unknown Team"
+    formatted_timestamp = timestamp.astimezone(ET).strftime("%Y-%m-%d %I:%M:%S %p")
+
+    interaction_id_value = interaction_id if agent_state in STATES_WITH_INTERACTION else "Not Applicable for This State"
+    campaign_value = campaign if agent_state in STATES_WITH_INTERACTION else "Not Applicable for This State"
+
+    return [
+        formatted_timestamp, agent, agent_state, duration_min, interaction_id_value,
+        campaign_value, team, user if user else "", monitoring if monitoring else "",
+        action if action else "", reason if reason else "", notes if notes else "",
+        approval_decision if approval_decision else "", approved_by if approved_by else "", status
+    ]
+
 def log_to_followups(agent, timestamp, duration_min, interaction_id, agent_state, campaign, user=None, monitoring=None, action=None, reason=None, notes=None, approval_decision=None, approved_by=None, status="Open"):
+    sheet_name = get_weekly_tab_name(timestamp)
     try:
         year = timestamp.year
         sheets_service_info = get_sheets_service(year, sheet_type="followup")
@@ -540,93 +878,74 @@ def log_to_followups(agent, timestamp, duration_min, interaction_id, agent_state
             return
 
         sheets_service, spreadsheet_id = sheets_service_info
-        sheet_name = get_weekly_tab_name(timestamp)
-        headers = [
-            "Timestamp", "Agent Name", "Agent State", "Duration (min)", "Interaction ID",
-            "Campaign", "Team", "Assigned To (Lead)", "Monitoring Method",
-            "Follow-Up Action", "Reason for Issue", "Additional Notes", "Approval Decision", "Approved By (Slack)", "Status"
-        ]
-        get_or_create_sheet_with_headers(sheets_service, spreadsheet_id, sheet_name, headers)
-        team = agent_teams.get(agent, "Unknown Team")
-
-        timestamp_et = timestamp.astimezone(ET)
-        formatted_timestamp = timestamp_et.strftime("%Y-%m-%d %I:%M:%S %p")
-
-        states_with_interaction = ["Busy", "Wrap", "Outgoing Wrap Up"]
-        interaction_id_value = interaction_id if agent_state in states_with_interaction else "Not Applicable for This State"
-        campaign_value = campaign if agent_state in states_with_interaction else "Not Applicable for This State"
-
-        values = [[
-            formatted_timestamp, agent, agent_state, duration_min, interaction_id_value,
-            campaign_value, team, user if user else "", monitoring if monitoring else "",
-            action if action else "", reason if reason else "", notes if notes else "",
-            approval_decision if approval_decision else "", approved_by if approved_by else "", status
-        ]]
-        sheets_service.spreadsheets().values().append(
-            spreadsheetId=spreadsheet_id,
-            range=f"'{sheet_name}'!A1",
-            valueInputOption="USER_ENTERED",
-            body={"values": values}
-        ).execute()
-        logger.info(f"Logged to {sheet_name} tab for {agent} at {formatted_timestamp} with status {status}")
+        row = build_followup_row(
+            agent, timestamp, duration_min, interaction_id, agent_state, campaign,
+            user, monitoring, action, reason, notes, approval_decision, approved_by, status
+        )
+        queue_sheet_rows(sheets_service, spreadsheet_id, sheet_name, FOLLOWUP_HEADERS, [row])
+        logger.info(f"Queued row for {sheet_name} tab for {agent} at {row[0]} with status {status}")
     except Exception as e:
         logger.error(f"Failed to log to {sheet_name} tab: {e}")
-        error_blocks = [
-            {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to log to Google Sheets (sheet: {sheet_name}): {str(e)}"}}
-        ]
-        session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
+        post_bot_error(f"Failed to log to Google Sheets (sheet: {sheet_name}): {str(e)}")
 
 # ========== AGENT STATE RULES ==========
-def should_trigger_alert(agent_state, duration_min, is_in_shift, event_data=None):
+# Agent state -> (alert once the state lasts longer than this many minutes, only alert during the agent's shift)
+ALERT_RULES = {
+    "Wrap": (2, False),
+    "Outgoing Wrap Up": (2, False),
+    "Ready": (2, True),
+    "Ready Outbound": (2, True),
+    "Idle": (2, True),
+    "Idle (Outbound)": (2, True),
+    "Busy": (8, False),
+    "Lunch": (30, False),
+    "Break": (15, False),
+    "Comfort Break": (5, False)
+}
+
+# States that alert as soon as they're seen, regardless of duration or shift
+ALWAYS_ALERT_STATES = frozenset({"Device Busy", "Device Unreachable", "Fault", "In Meeting", "Paperwork", "Team Meeting", "Training"})
+
+def should_trigger_alert(agent_state, duration_min, is_in_shift):
     """Check if an alert should be triggered based on the agent state and duration."""
     try:
-        event_data["alert_agent_state"] = agent_state
-        event_data["alert_duration_min"] = duration_min
-
-        if agent_state in ["Wrap", "Outgoing Wrap Up"] and duration_min > 2:
-            return True
-        elif agent_state in ["Ready", "Ready Outbound", "Idle", "Idle (Outbound)"] and duration_min > 2 and is_in_shift:
-            return True
-        elif agent_state == "Busy" and duration_min > 8:
-            return True
-        elif agent_state == "Lunch" and duration_min > 30:
-            return True
-        elif agent_state == "Break" and duration_min > 15:
-            return True
-        elif agent_state == "Comfort Break" and duration_min > 5:
-            return True
-        elif agent_state == "Logged Out" and is_in_shift:
+        if agent_state in ALWAYS_ALERT_STATES:
             return True
-        elif agent_state in ["Device Busy", "Device Unreachable", "Fault", "In Meeting", "Paperwork", "Team Meeting", "Training"]:
-            return True
-
-        return False
+        if agent_state == "Logged Out":
+            return is_in_shift
+        rule = ALERT_RULES.get(agent_state)
+        if rule is None:
+            return False
+        threshold_min, requires_shift = rule
+        return duration_min > threshold_min and (is_in_shift or not requires_shift)
     except Exception as e:
         logger.error(f"ERROR in should_trigger_alert: {e}")
         return False
 
+# Emoji shown at the start of each alert, by agent state
+EVENT_EMOJIS = {
+    "Wrap": "📝",
+    "Outgoing Wrap Up": "📝",
+    "Ready": "📞",
+    "Ready Outbound": "📤",
+    "Idle": "❗",
+    "Idle (Outbound)": "❗",
+    "Busy": "💻",
+    "Lunch": "🍽️",
+    "Break": "☕",
+    "Comfort Break": "🚻",
+    "Logged Out": "🔌",
+    "Device Busy": "💻",
+    "Device Unreachable": "🔌",
+    "Fault": "⚠️",
+    "In Meeting": "👥",
+    "Paperwork": "🗂️",
+    "Team Meeting": "👥",
+    "Training": "📚"
+}
+
 def get_emoji_for_event(agent_state):
-    emoji_map = {
-        "Wrap": "📝",
-        "Outgoing Wrap Up": "📝",
-        "Ready": "📞",
-        "Ready Outbound": "📤",
-        "Idle": "❗",
-        "Idle (Outbound)": "❗",
-        "Busy": "💻",
-        "Lunch": "🍽️",
-        "Break": "☕",
-        "Comfort Break": "🚻",
-        "Logged Out": "🔌",
-        "Device Busy": "💻",
-        "Device Unreachable": "🔌",
-        "Fault": "⚠️",
-        "In Meeting": "👥",
-        "Paperwork": "🗂️",
-        "Team Meeting": "👥",
-        "Training": "📚"
-    }
-    return emoji_map.get(agent_state, "⚠️")
+    return EVENT_EMOJIS.get(agent_state, "⚠️")
 
 # ========== HEALTH CHECK ENDPOINT ==========
 @app.route("/health", methods=["GET"])
@@ -635,8 +954,8 @@ def health_check():
     health_status = {"status": "healthy", "checks": {}}
 
     try:
-        response = session.post("https://slack.com/api/auth.test", headers=headers)
-        if response.status_code == 200 and response.json().get("ok"):
+        response = session.post("https://slack.com/api/auth.test", timeout=SLACK_TIMEOUT)
+        if response.status_code == 200 and orjson.loads(response.content).get("ok"):
             health_status["checks"]["slack"] = "healthy"
         else:
             health_status["checks"]["slack"] = f"unhealthy: {response.text}"
@@ -646,7 +965,7 @@ def health_check():
         health_status["status"] = "unhealthy"
 
     try:
-        year = datetime.utcnow().year
+        year = datetime.now(UTC).year
         sheets_service_info = get_sheets_service(year, sheet_type="followup")
         if sheets_service_info:
             health_status["checks"]["google_sheets"] = "healthy"
@@ -657,283 +976,518 @@ def health_check():
         health_status["checks"]["google_sheets"] = f"unhealthy: {str(e)}"
         health_status["status"] = "unhealthy"
 
-    return jsonify(health_status), 200 if health_status["status"] == "healthy" else 500
+    return _json_response(health_status, 200 if health_status["status"] == "healthy" else 500)
 
 # ========== VONAGE WEBHOOK FOR REAL-TIME ALERTS ==========
-@app.route("/vonage-events", methods=["POST"])
-def vonage_events():
-    current_time_et = datetime.utcnow().replace(tzinfo=pytz.UTC).astimezone(ET)
-    logger.info(f"Received request to /vonage-events at {current_time_et.isoformat()}")
-    try:
-        data = request.json
-        if not data:
-            logger.error("No JSON data in request")
-            return jsonify({"status": "error", "message": "No JSON data in request"}), 400
+# Event types dropped as soon as they arrive
+SKIPPED_EVENT_TYPES = frozenset({"channel.alerted.v1", "channel.connected.v1"})
+
+# Alerts for these states ask management to approve the time
+APPROVAL_STATES = frozenset({"Training", "In Meeting", "Paperwork", "Team Meeting"})
+
+# Alerts for these states have no interaction to copy or open in Vonage
+STATES_WITHOUT_INTERACTION = frozenset({
+    "Idle", "Idle (Outbound)", "Device Busy", "Device Unreachable", "Fault",
+    "In Meeting", "Paperwork", "Team Meeting", "Training", "Logged Out"
+})
+
+# Event types that update state tracking but never notify
+SKIP_NOTIFICATION_EVENT_TYPES = frozenset({"channel.ended.v1", "channel.disconnected.v1", "interaction.detailrecord.v0"})
+
+# Channel event type -> agent state, used when the event carries no presence/activity state
+CHANNEL_EVENT_TO_STATE = {
+    "channel.connectionfailed.v1": "Device Busy",
+    "channel.ended.v1": "Logged Out",
+    "channel.held.v1": "Break",
+    "channel.interrupted.v1": "Break",
+    "channel.resumed.v1": "Ready",
+    "channel.retrieved.v1": "Ready",
+    "channel.unparked.v1": "Ready",
+    "channel.wrapstarted.v1": "Wrap"
+}
 
-        logger.debug(f"Vonage event payload: {json.dumps(data, indent=2, default=str)}")
+# Vonage presence category type -> agent state
+PRESENCE_TYPE_TO_STATE = {
+    "lunch": "Lunch",
+    "break": "Break",
+    "comfort_break": "Comfort Break",
+    "logged_out": "Logged Out",
+    "training": "Training",
+    "meeting": "In Meeting",
+    "paperwork": "Paperwork",
+    "team_meeting": "Team Meeting"
+}
 
-        event_type = data.get("type", None)
-        if not event_type:
-            logger.error("Missing event type in Vonage payload")
-            return jsonify({"status": "error", "message": "Missing event type"}), 400
+# Presence types with an outbound flavour: type -> (state, state when subcategory/description mention "outbound")
+PRESENCE_OUTBOUND_VARIANTS = {
+    "ready": ("Ready", "Ready Outbound"),
+    "idle": ("Idle", "Idle (Outbound)")
+}
 
-        if event_type in ["channel.alerted.v1", "channel.connected.v1"]:
-            logger.info(f"Skipping event type {event_type} as per requirements")
-            return jsonify({"status": "skipped", "message": f"Event type {event_type} not processed"}), 200
+# Activity record interaction state -> agent state
+ACTIVITY_STATE_MAP = {
+    "wrap": "Wrap",
+    "busy": "Busy",
+    "ready": "Ready"
+}
 
-        timestamp_str = data.get("time", datetime.utcnow().isoformat())
-        try:
-            timestamp = parse(timestamp_str).replace(tzinfo=pytz.UTC)
-        except Exception as e:
-            logger.error(f"Failed to parse timestamp {timestamp_str}: {e}")
-            return jsonify({"status": "error", "message": "Invalid timestamp"}), 400
+def _extract_campaign(interaction):
+    """Campaign from the first group, else the first skill, else the caller/called number."""
+    groups = interaction.get("groups")
+    if groups:
+        logger.debug("Campaign extracted from groups: %s", groups[0])
+        return groups[0]
+    skills = interaction.get("skills")
+    if skills:
+        logger.debug("Campaign extracted from skills: %s", skills[0])
+        return skills[0]
+    campaign = get_campaign_from_number(interaction.get("fromAddress") or interaction.get("toAddress"))
+    logger.debug("Campaign extracted from phone number: %s", campaign)
+    return campaign
+
+def _extract_presence_state(event_data):
+    """Map a presence-change payload to an agent state, walking presence/category once."""
+    presence = event_data.get("presence") or {}
+    category = presence.get("category") or {}
+    presence_type = (category.get("type") or "").lower()
+    outbound_variants = PRESENCE_OUTBOUND_VARIANTS.get(presence_type)
+    if outbound_variants is None:
+        return PRESENCE_TYPE_TO_STATE.get(presence_type)
+    # Subcategory/description only matter for ready/idle, so they are read and lowered here
+    is_outbound = "outbound" in (category.get("subcategory") or "").lower() or "outbound" in (presence.get("description") or "").lower()
+    base_state, outbound_state = outbound_variants
+    return outbound_state if is_outbound else base_state
+
+VONAGE_LINK = "https://nam.newvoicemedia.com/CallCentre/portal/interactionsearch"
+
+# Alert button templates; per-event buttons only add their "value"
+_BTN_ASSIGN_TPL = {"type": "button", "text": {"type": "plain_text", "text": "✅ Assigned to Me"}, "action_id": "assign_to_me"}
+_BTN_COPY_TPL = {"type": "button", "text": {"type": "plain_text", "text": "📋 Copy Interaction ID"}, "action_id": "copy_interaction_id"}
+_BTN_APPROVE_TPL = {"type": "button", "text": {"type": "plain_text", "text": "✅ Approved by Management"}, "action_id": "approve_event"}
+_BTN_NOT_APPROVE_TPL = {"type": "button", "text": {"type": "plain_text", "text": "❌ Not Approved"}, "action_id": "not_approve_event"}
+_BTN_VONAGE = {"type": "button", "text": {"type": "plain_text", "text": "🔗 Vonage"}, "url": VONAGE_LINK, "action_id": "vonage_link"}
+
+# Alert block factories; only the per-event text and button values are built per call
+def _alert_section(text):
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+def _blocks_approval(emoji, agent, team, agent_state, duration_min, interaction_id):
+    """Alert for states that need management approval: approve / not approve buttons."""
+    return [
+        _alert_section(f"{emoji} *{agent_state} Alert*\nAgent: {agent}\nTeam: {team}\nDuration: {duration_min:.2f} min"),
+        {"type": "actions", "elements": [
+            {**_BTN_APPROVE_TPL, "value": f"approve|{agent}|{interaction_id}|{agent_state}"},
+            {**_BTN_NOT_APPROVE_TPL, "value": f"not_approve|{agent}|{interaction_id}|{agent_state}"}
+        ]}
+    ]
+
+def _blocks_assign_only(emoji, agent, team, agent_state, duration_min, interaction_id, timestamp, campaign):
+    """Alert for states with no interaction to look up: just the assign button."""
+    return [
+        _alert_section(f"{emoji} *{agent_state} Alert*\nAgent: {agent}\nTeam: {team}\nDuration: {duration_min:.2f} min"),
+        {"type": "actions", "elements": [
+            {**_BTN_ASSIGN_TPL, "value": f"assign|{agent}|{interaction_id}|{agent_state}|{duration_min}|{timestamp.isoformat()}|{campaign}"}
+        ]}
+    ]
+
+def _blocks_full(emoji, agent, team, agent_state, duration_min, interaction_id, timestamp, campaign):
+    """Alert for interaction states: campaign line plus assign, copy-ID and Vonage buttons."""
+    return [
+        _alert_section(f"{emoji} *{agent_state} Alert*\nAgent: {agent}\nTeam: {team}\nDuration: {duration_min:.2f} min\nCampaign: {campaign}"),
+        {"type": "actions", "elements": [
+            {**_BTN_ASSIGN_TPL, "value": f"assign|{agent}|{interaction_id}|{agent_state}|{duration_min}|{timestamp.isoformat()}|{campaign}"},
+            {**_BTN_COPY_TPL, "value": interaction_id},
+            _BTN_VONAGE
+        ]}
+    ]
+
+# Agent name extractors, one per Vonage payload shape
+def _agent_from_user(event_data):
+    user_data = event_data.get("user", {})
+    return user_data.get("name") or user_data.get("displayName") or user_data.get("agentName")
+
+def _agent_from_interaction_channel(event_data):
+    channel = event_data["interaction"]["channel"]
+    return channel.get("agentName") or channel.get("name")
+
+def _agent_from_interaction_channels(event_data):
+    names = (channel.get("agentName") or channel.get("name") for channel in event_data["interaction"]["channels"])
+    return next((name for name in names if name), None)
+
+def _agent_from_channel_party(event_data):
+    channel = event_data["channel"]
+    return channel.get("agentName") or channel.get("name")
+
+_AGENT_EXTRACTORS = {
+    "presence": _agent_from_user,
+    "interaction_channel": _agent_from_interaction_channel,
+    "interaction_channels": _agent_from_interaction_channels,
+    "channel_party": _agent_from_channel_party,
+    "user": _agent_from_user
+}
+
+def extract_agent_name(event_type, event_data):
+    """Classify the Vonage payload shape once and run the matching agent-name extractor."""
+    if event_type == "agent.presencechanged.v1":
+        shape = "presence"
+    elif "interaction" in event_data:
+        interaction = event_data["interaction"]
+        if "channel" in interaction:
+            shape = "interaction_channel"
+        elif "channels" in interaction:
+            shape = "interaction_channels"
+        else:
+            return None
+    elif "party" in event_data.get("channel", ()):
+        shape = "channel_party"
+    elif "user" in event_data:
+        shape = "user"
+    else:
+        return None
+    return _AGENT_EXTRACTORS[shape](event_data)
+
+def post_alert_in_background(blocks, alert_key, alert_epoch):
+    """Post an alert off the request thread so Slack retries/backoff never hold up the webhook."""
+    # Claim the dedup slot now so a burst of events can't queue the same alert twice; hand it back on failure
+    with last_alerts_lock:
+        previous_alert_time = last_alerts.get(alert_key)
+        last_alerts[alert_key] = alert_epoch
+        last_alerts.move_to_end(alert_key)
+        if len(last_alerts) > LAST_ALERTS_MAX:
+            last_alerts.popitem(last=False)
+
+    def on_done(future):
+        post_result = None if future.exception() else future.result()
+        if post_result:
+            logger.info(f"Successfully posted alert to Slack with ts: {post_result}")
+            return
+        logger.error(f"Failed to post alert to Slack: {future.exception() or 'no ts returned'}")
+        with last_alerts_lock:
+            if last_alerts.get(alert_key) == alert_epoch:
+                if previous_alert_time is None:
+                    last_alerts.pop(alert_key, None)
+                else:
+                    last_alerts[alert_key] = previous_alert_time
 
+    background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, blocks).add_done_callback(on_done)
+
+def process_vonage_event(data, event_type, timestamp):
+    """Run state tracking and alerting for one Vonage event (runs on vonage_executor, in arrival order)."""
+    try:
         interaction_id = data.get("subject", "-") if event_type != "agent.presencechanged.v1" else "-"
 
         event_data = data.get("data", {})
         event_data["timestamp"] = timestamp
 
         # Extract agent name directly
-        agent = None
-        if event_type == "agent.presencechanged.v1":
-            user_data = event_data.get("user", {})
-            agent = user_data.get("name", None) or user_data.get("displayName", None) or user_data.get("agentName", None)
-        elif "interaction" in event_data:
-            if "channel" in event_data["interaction"]:
-                channel = event_data["interaction"]["channel"]
-                agent = channel.get("agentName", None) or channel.get("name", None)
-            elif "channels" in event_data["interaction"]:
-                for channel in event_data["interaction"]["channels"]:
-                    agent = channel.get("agentName", None) or channel.get("name", None)
-                    if agent:
-                        break
-        elif "channel" in event_data and "party" in event_data["channel"]:
-            agent = event_data["channel"].get("agentName", None) or event_data["channel"].get("name", None)
-        elif "user" in event_data:
-            agent = event_data["user"].get("name", None) or event_data["user"].get("displayName", None) or event_data["user"].get("agentName", None)
+        agent = extract_agent_name(event_type, event_data)
 
         if not agent:
-            logger.warning(f"Could not determine agent name from Vonage payload. Full payload: {json.dumps(data, indent=2, default=str)}")
-            return jsonify({"status": "skipped", "message": "Agent name not found, event skipped"}), 200
+            logger.warning("Could not determine agent name from Vonage payload. Full payload: %s", LazyJson(data))
+            return
 
         # Validate agent name against known agents
-        if agent not in agent_shifts:
-            logger.warning(f"Agent name '{agent}' not recognized in agent_shifts. Full payload: {json.dumps(data, indent=2, default=str)}")
-            return jsonify({"status": "skipped", "message": "Unrecognized agent name"}), 200
+        agent_info = AGENTS.get(agent)
+        if agent_info is None:
+            logger.warning("Agent name '%s' not recognized in agent_shifts. Full payload: %s", agent, LazyJson(data))
+            return
 
         event_data["agent"] = agent
-
-        # Extract campaign from groups or skills (preferred), fall back to phone number
-        campaign = "Unknown Campaign"
-        if "interaction" in event_data:
-            interaction = event_data["interaction"]
-            
-            # Try to get the campaign from 'groups' first
-            groups = interaction.get("groups", [])
-            if groups and isinstance(groups, list) and len(groups) > 0:
-                campaign = groups[0]  # Take the first group as the campaign name
-                logger.info(f"Campaign extracted from groups: {campaign}")
-            else:
-                # If no groups, try 'skills'
-                skills = interaction.get("skills", [])
-                if skills and isinstance(skills, list) and len(skills) > 0:
-                    campaign = skills[0]  # Take the first skill as the campaign name
-                    logger.info(f"Campaign extracted from skills: {campaign}")
-                else:
-                    # Fall back to phone number mapping if neither groups nor skills are available
-                    campaign_phone = interaction.get("fromAddress", None) or interaction.get("toAddress", None)
-                    campaign = get_campaign_from_number(campaign_phone)
-                    logger.info(f"Campaign extracted from phone number: {campaign}")
-        else:
-            logger.warning("No interaction data found in event payload, defaulting campaign to 'Unknown Campaign'")
+        state_timestamps = agent_state_timestamps[agent]
+        # Several log lines below show the event time in ET; convert it at most once
+        timestamp_et = LazyEtTime(timestamp)
 
         # Determine agent state
         agent_state = None
         if event_type == "agent.presencechanged.v1":
-            presence_type = event_data.get("presence", {}).get("category", {}).get("type", "").lower()
-            subcategory = event_data.get("presence", {}).get("category", {}).get("subcategory", "").lower()
-            description = event_data.get("presence", {}).get("description", "").lower()
-            if presence_type == "ready":
-                if "outbound" in subcategory or "outbound" in description or "ready_outbound" in subcategory or "ready_outbound" in description:
-                    agent_state = "Ready Outbound"
-                else:
-                    agent_state = "Ready"
-            elif presence_type == "lunch":
-                agent_state = "Lunch"
-            elif presence_type == "break":
-                agent_state = "Break"
-            elif presence_type == "comfort_break":
-                agent_state = "Comfort Break"
-            elif presence_type == "logged_out":
-                agent_state = "Logged Out"
-            elif presence_type == "training":
-                agent_state = "Training"
-            elif presence_type == "meeting":
-                agent_state = "In Meeting"
-            elif presence_type == "paperwork":
-                agent_state = "Paperwork"
-            elif presence_type == "idle":
-                if "outbound" in subcategory or "outbound" in description:
-                    agent_state = "Idle (Outbound)"
-                else:
-                    agent_state = "Idle"
-            elif presence_type == "team_meeting":
-                agent_state = "Team Meeting"
+            agent_state = _extract_presence_state(event_data)
 
             # Update the agent's presence state in memory
             if agent_state:
                 agent_presence_states[agent] = (agent_state, timestamp)
-                state_key = f"{agent}:{agent_state}"
-                agent_state_timestamps[state_key] = timestamp
-                logger.info(f"Updated presence state for {agent}: {agent_state} at {timestamp.astimezone(ET).isoformat()}")
+                state_timestamps[agent_state] = timestamp
+                logger.info("Updated presence state for %s: %s at %s", agent, agent_state, timestamp_et)
 
         # Handle activity record events for state tracking
         elif event_type == "channel.activityrecord.v0":
             interaction = event_data.get("interaction", {})
-            state = interaction.get("state", "").lower()
+            state = (interaction.get("state") or "").lower()
             start_time_str = interaction.get("startTime")
             end_time_str = interaction.get("endTime")
 
-            if state:
-                if state == "wrap":
-                    agent_state = "Wrap"
-                elif state == "busy":
-                    agent_state = "Busy"
-                elif state == "ready":
-                    agent_state = "Ready"
+            agent_state = ACTIVITY_STATE_MAP.get(state)
 
             if agent_state and start_time_str:
                 try:
-                    start_timestamp = parse(start_time_str).replace(tzinfo=pytz.UTC)
-                    state_key = f"{agent}:{agent_state}"
-                    agent_state_timestamps[state_key] = start_timestamp
-                    logger.info(f"Updated state timestamp for {agent} in state {agent_state}: {start_timestamp.astimezone(ET).isoformat()}")
+                    start_timestamp = parse_event_timestamp(start_time_str)
+                    state_timestamps[agent_state] = start_timestamp
+                    logger.info("Updated state timestamp for %s in state %s: %s", agent, agent_state, LazyEtTime(start_timestamp))
                 except Exception as e:
                     logger.error(f"Failed to parse startTime {start_time_str}: {e}")
 
             if end_time_str:
                 try:
-                    end_timestamp = parse(end_time_str).replace(tzinfo=pytz.UTC)
-                    state_key = f"{agent}:{agent_state}"
-                    if state_key in agent_state_timestamps:
-                        del agent_state_timestamps[state_key]
-                        logger.info(f"Cleared state timestamp for {agent} in state {agent_state} at {end_timestamp.astimezone(ET).isoformat()}")
+                    end_timestamp = parse_event_timestamp(end_time_str)
+                    if state_timestamps.pop(agent_state, None) is not None:
+                        logger.info("Cleared state timestamp for %s in state %s at %s", agent, agent_state, LazyEtTime(end_timestamp))
                 except Exception as e:
                     logger.error(f"Failed to parse endTime {end_time_str}: {e}")
 
         # If not a presence change or activity record, check for specific channel events
         if not agent_state:
-            if event_type == "channel.connectionfailed.v1":
-                agent_state = "Device Busy"
-            elif event_type == "channel.ended.v1":
-                agent_state = "Logged Out"
-            elif event_type == "channel.held.v1":
-                agent_state = "Break"
-            elif event_type == "channel.interrupted.v1":
-                agent_state = "Break"
-            elif event_type == "channel.resumed.v1":
-                agent_state = "Ready"
-            elif event_type == "channel.retrieved.v1":
-                agent_state = "Ready"
-            elif event_type == "channel.unparked.v1":
-                agent_state = "Ready"
-            elif event_type == "channel.wrapstarted.v1":
-                agent_state = "Wrap"
+            agent_state = CHANNEL_EVENT_TO_STATE.get(event_type)
 
         # If we still don't have an agent state, check the stored presence state
-        if not agent_state and agent in agent_presence_states:
-            agent_state = agent_presence_states[agent][0]
+        if not agent_state:
+            previous_presence = agent_presence_states.get(agent)
+            if previous_presence is not None:
+                agent_state = previous_presence[0]
 
         if not agent_state:
             agent_state = "Unknown"
             logger.warning(f"Agent state could not be determined for {agent}, defaulting to Unknown")
 
+        # Events that never notify only need to close out the state they ended
+        if event_type in SKIP_NOTIFICATION_EVENT_TYPES:
+            logger.info("Skipping notification for event type: %s", event_type)
+            if state_timestamps.pop(agent_state, None) is not None:
+                logger.info("Cleared state timestamp for %s in state %s", agent, agent_state)
+            return
+
         # Update the state timestamp if not already set by activity record
-        state_key = f"{agent}:{agent_state}"
-        if state_key not in agent_state_timestamps:
-            agent_state_timestamps[state_key] = timestamp
-            logger.info(f"Set initial timestamp for {agent} in state {agent_state}: {timestamp.astimezone(ET).isoformat()}")
+        if agent_state not in state_timestamps:
+            state_timestamps[agent_state] = timestamp
+            logger.info("Set initial timestamp for %s in state %s: %s", agent, agent_state, timestamp_et)
+
+        interaction = event_data.get("interaction")
+        if interaction is not None:
+            campaign = _extract_campaign(interaction)
+        else:
+            campaign = "Unknown Campaign"
+            logger.warning("No interaction data found in event payload, defaulting campaign to 'Unknown Campaign'")
 
         # Calculate duration based on the time the agent entered the current state
         duration_min = get_event_duration(agent, agent_state, timestamp)
 
-        if event_type in ["channel.ended.v1", "channel.disconnected.v1", "interaction.detailrecord.v0"]:
-            logger.info(f"Skipping notification for event type: {event_type}")
-            if state_key in agent_state_timestamps:
-                del agent_state_timestamps[state_key]
-                logger.info(f"Cleared state timestamp for {agent} in state {agent_state}")
-            return jsonify({"status": "skipped", "message": f"Notifications disabled for {event_type}"}), 200
-
         is_in_shift = is_within_shift(agent, timestamp)
-        logger.info(f"Event: {event_type}, Agent: {agent}, Agent State: {agent_state}, Duration: {duration_min} min, In Shift: {is_in_shift}, Campaign: {campaign}, Interaction ID: {interaction_id}")
+        logger.info("Event: %s, Agent: %s, Agent State: %s, Duration: %s min, In Shift: %s, Campaign: %s, Interaction ID: %s", event_type, agent, agent_state, duration_min, is_in_shift, campaign, interaction_id)
 
         # Deduplicate alerts
-        alert_key = f"{agent}:{agent_state}"
-        if alert_key in last_alerts:
-            last_alert_time = last_alerts[alert_key]
-            time_since_last_alert = (timestamp - last_alert_time).total_seconds() / 60
-            if time_since_last_alert < 5:
-                logger.info(f"Skipping duplicate alert for {agent}: {agent_state} (last sent {time_since_last_alert:.2f} minutes ago)")
-                return jsonify({"status": "skipped", "message": "Duplicate alert skipped"}), 200
-
-        if should_trigger_alert(agent_state, duration_min, is_in_shift, event_data):
-            agent_state = event_data.get("alert_agent_state", agent_state)
-            duration_min = event_data.get("alert_duration_min", duration_min)
+        alert_key = (agent, agent_state)
+        alert_epoch = int(timestamp.timestamp())
+        last_alert_epoch = last_alerts.get(alert_key)
+        if last_alert_epoch is not None and alert_epoch - last_alert_epoch < ALERT_DEDUP_SECONDS:
+            logger.info("Skipping duplicate alert for %s: %s (last sent %.2f minutes ago)", agent, agent_state, (alert_epoch - last_alert_epoch) / 60)
+            return
+
+        if should_trigger_alert(agent_state, duration_min, is_in_shift):
             emoji = get_emoji_for_event(agent_state)
-            team = agent_teams.get(agent, "Unknown Team")
-            vonage_link = "https://nam.newvoicemedia.com/CallCentre/portal/interactionsearch"
-            states_without_interaction = ["Idle", "Idle (Outbound)", "Device Busy", "Device Unreachable", "Fault", "In Meeting", "Paperwork", "Team Meeting", "Training", "Logged Out"]
-
-            if agent_state in ["Training", "In Meeting", "Paperwork", "Team Meeting"]:
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"{emoji} *{agent_state} Alert*\nAgent: {agent}\nTeam: {team}\nDuration: {duration_min:.2f} min"}},
-                    {"type": "actions", "elements": [
-                        {"type": "button", "text": {"type": "plain_text", "text": "✅ Approved by Management"}, "value": f"approve|{agent}|{interaction_id}|{agent_state}", "action_id": "approve_event"},
-                        {"type": "button", "text": {"type": "plain_text", "text": "❌ Not Approved"}, "value": f"not_approve|{agent}|{interaction_id}|{agent_state}", "action_id": "not_approve_event"}
-                    ]}
-                ]
-            elif agent_state in states_without_interaction:
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"{emoji} *{agent_state} Alert*\nAgent: {agent}\nTeam: {team}\nDuration: {duration_min:.2f} min"}},
-                    {"type": "actions", "elements": [
-                        {"type": "button", "text": {"type": "plain_text", "text": "✅ Assigned to Me"}, "value": f"assign|{agent}|{interaction_id}|{agent_state}|{duration_min}|{timestamp.isoformat()}|{campaign}", "action_id": "assign_to_me"}
-                    ]}
-                ]
-            else:
-                buttons = [
-                    {"type": "button", "text": {"type": "plain_text", "text": "✅ Assigned to Me"}, "value": f"assign|{agent}|{interaction_id}|{agent_state}|{duration_min}|{timestamp.isoformat()}|{campaign}", "action_id": "assign_to_me"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "📋 Copy Interaction ID"}, "value": interaction_id, "action_id": "copy_interaction_id"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "🔗 Vonage"}, "url": vonage_link, "action_id": "vonage_link"}
-                ]
-                # Removed Interaction ID from the message text
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"{emoji} *{agent_state} Alert*\nAgent: {agent}\nTeam: {team}\nDuration: {duration_min:.2f} min\nCampaign: {campaign}"}},
-                    {"type": "actions", "elements": buttons}
-                ]
-            post_result = post_slack_message(ALERT_CHANNEL_ID, blocks)
-            if post_result:
-                last_alerts[alert_key] = timestamp
-                logger.info(f"Successfully posted alert to Slack with ts: {post_result}")
+            team = agent_info.team
+
+            # Most alerts are for interaction states (Wrap, Ready, Busy), so test for those first;
+            # APPROVAL_STATES is a subset of STATES_WITHOUT_INTERACTION
+            if agent_state not in STATES_WITHOUT_INTERACTION:
+                # Interaction ID is carried by the copy button rather than shown in the message text
+                blocks = _blocks_full(emoji, agent, team, agent_state, duration_min, interaction_id, timestamp, campaign)
+            elif agent_state in APPROVAL_STATES:
+                blocks = _blocks_approval(emoji, agent, team, agent_state, duration_min, interaction_id)
             else:
-                logger.error("Failed to post alert to Slack")
+                blocks = _blocks_assign_only(emoji, agent, team, agent_state, duration_min, interaction_id, timestamp, campaign)
+            post_alert_in_background(blocks, alert_key, alert_epoch)
         else:
-            logger.info(f"Alert not triggered for {agent}: Agent State={agent_state}, Duration={duration_min}, In Shift={is_in_shift}")
-        return jsonify({"status": "posted"}), 200
+            logger.info("Alert not triggered for %s: Agent State=%s, Duration=%s, In Shift=%s", agent, agent_state, duration_min, is_in_shift)
+    except Exception as e:
+        logger.error(f"ERROR processing Vonage {event_type} event: {e}")
+
+@app.route("/vonage-events", methods=["POST"])
+def vonage_events():
+    logger.info("Received request to /vonage-events")
+    try:
+        try:
+            data = orjson.loads(request.get_data())
+        except orjson.JSONDecodeError:
+            data = None
+        if not data:
+            logger.error("No JSON data in request")
+            return _json_response({"status": "error", "message": "No JSON data in request"}, 400)
+
+        logger.debug("Vonage event payload: %s", LazyJson(data))
+
+        event_type = data.get("type", None)
+        if not event_type:
+            logger.error("Missing event type in Vonage payload")
+            return _json_response({"status": "error", "message": "Missing event type"}, 400)
+
+        if event_type in SKIPPED_EVENT_TYPES:
+            logger.info("Skipping event type %s as per requirements", event_type)
+            return _json_response({"status": "skipped", "message": f"Event type {event_type} not processed"}, 200)
+
+        timestamp_str = data.get("time")
+        if timestamp_str is None:
+            timestamp_str = datetime.now(UTC).isoformat()
+        try:
+            timestamp = parse_event_timestamp(timestamp_str)
+        except Exception as e:
+            logger.error(f"Failed to parse timestamp {timestamp_str}: {e}")
+            return _json_response({"status": "error", "message": "Invalid timestamp"}, 400)
+
+        # Drop redeliveries of an event we've already accepted, keyed on the raw "time" so a missing one never matches
+        if data.get("time") is not None and is_duplicate_vonage_event((event_type, data.get("subject"), data["time"])):
+            logger.info("Skipping duplicate delivery of %s event %s", event_type, data.get("subject"))
+            return _json_response({"status": "skipped", "message": "Duplicate event"}, 200)
+
+        vonage_executor.submit(process_vonage_event, data, event_type, timestamp)
+        return _json_response({"status": "queued"}, 200)
     except Exception as e:
         logger.error(f"ERROR in /vonage-events: {e}")
-        return jsonify({"status": "error", "message": str(e)}), 200
+        return _json_response({"status": "error", "message": str(e)}, 200)
 
 # ========== SLACK COMMANDS ==========
+# Static weekly update modal view; private_metadata is filled in per request
+WEEKLY_UPDATE_VIEW = {
+    "type": "modal",
+    "callback_id": "weekly_update_modal",
+    "title": {"type": "plain_text", "text": "Team Progress Log"},
+    "submit": {"type": "plain_text", "text": "Submit"},
+    "close": {"type": "plain_text", "text": "Close"},
+    "blocks": [
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": "*Let’s capture this week’s wins, challenges, and team progress below. 👇*"}
+        },
+        {
+            "type": "input",
+            "block_id": "start_date",
+            "element": {
+                "type": "datepicker",
+                "action_id": "start_date_picker",
+                "placeholder": {"type": "plain_text", "text": "Select start date"}
+            },
+            "label": {"type": "plain_text", "text": "Start of Week"}
+        },
+        {
+            "type": "input",
+            "block_id": "end_date",
+            "element": {
+                "type": "datepicker",
+                "action_id": "end_date_picker",
+                "placeholder": {"type": "plain_text", "text": "Select end date"}
+            },
+            "label": {"type": "plain_text", "text": "End of Week"}
+        },
+        {
+            "type": "input",
+            "block_id": "top_performers",
+            "element": {
+                "type": "multi_static_select",
+                "action_id": "top_performers_select",
+                "placeholder": {"type": "plain_text", "text": "Select top performers"},
+                "options": employee_options
+            },
+            "label": {"type": "plain_text", "text": "Top Performers"}
+        },
+        {
+            "type": "input",
+            "block_id": "top_support",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "top_support_input",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "How are you supporting top performers?"}
+            },
+            "label": {"type": "plain_text", "text": "Support Actions for Top Performers"}
+        },
+        {
+            "type": "input",
+            "block_id": "bottom_performers",
+            "element": {
+                "type": "multi_static_select",
+                "action_id": "bottom_performers_select",
+                "placeholder": {"type": "plain_text", "text": "Select bottom performers"},
+                "options": employee_options
+            },
+            "label": {"type": "plain_text", "text": "Bottom Performers"}
+        },
+        {
+            "type": "input",
+            "block_id": "bottom_actions",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "bottom_actions_input",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "Describe coaching, follow-up, etc."}
+            },
+            "label": {"type": "plain_text", "text": "Support Actions for Bottom Performers"}
+        },
+        {
+            "type": "input",
+            "block_id": "improvement_plan",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "improvement_plan_input",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "Are they improving? What's the plan?"}
+            },
+            "label": {"type": "plain_text", "text": "Improvement Plan"}
+        },
+        {
+            "type": "input",
+            "block_id": "team_momentum",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "team_momentum_input",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "Are you rising together or are there support gaps?"}
+            },
+            "label": {"type": "plain_text", "text": "Team Momentum"}
+        },
+        {
+            "type": "input",
+            "block_id": "trends",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "trends_input",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "Any recurring behaviors, client feedback, or performance shifts?"}
+            },
+            "label": {"type": "plain_text", "text": "Trends"}
+        },
+        {
+            "type": "input",
+            "block_id": "additional_notes",
+            "optional": True,
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "notes_input",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "Shoutouts, observations, anything else to share?"}
+            },
+            "label": {"type": "plain_text", "text": "Additional Notes"}
+        }
+    ]
+}
+
+# WEEKLY_UPDATE_VIEW serialized once, without its closing brace so private_metadata can be appended per request
+_WEEKLY_UPDATE_VIEW_OPEN = orjson.dumps(WEEKLY_UPDATE_VIEW)[:-1]
+
+def weekly_update_view_body(trigger_id, channel_id):
+    """views.open request body for the weekly update modal; only the trigger ID and metadata are serialized per call."""
+    private_metadata = orjson.dumps({"channel_id": channel_id}).decode()
+    return (
+        b'{"trigger_id":' + orjson.dumps(trigger_id)
+        + b',"view":' + _WEEKLY_UPDATE_VIEW_OPEN
+        + b',"private_metadata":' + orjson.dumps(private_metadata) + b'}}'
+    )
+
 @app.route("/slack/commands/weekly_update_form", methods=["GET", "POST"])
 def slack_command_weekly_update_form():
-    current_time_et = datetime.utcnow().replace(tzinfo=pytz.UTC).astimezone(ET)
-    logger.info(f"Received {request.method} request to /slack/commands/weekly_update_form at {current_time_et.isoformat()}")
+    logger.info(f"Received {request.method} request to /slack/commands/weekly_update_form")
     if request.method == "GET":
         logger.info("Slack verification request received")
         return "This endpoint is for Slack slash commands. Please use POST to send a command.", 200
 
     try:
-        logger.debug(f"Slash command payload: {request.form}")
+        logger.debug("Slash command payload: %s", request.form)
         trigger_id = request.form.get("trigger_id")
         channel_id = request.form.get("channel_id")
         
@@ -945,144 +1499,14 @@ def slack_command_weekly_update_form():
             return "Missing channel_id", 400
 
         logger.info(f"SLACK_BOT_TOKEN: {'Set' if SLACK_BOT_TOKEN else 'Not Set'}")
-        logger.debug(f"Headers: {headers}")
-
-        modal = {
-            "trigger_id": trigger_id,
-            "view": {
-                "type": "modal",
-                "callback_id": "weekly_update_modal",
-                "title": {"type": "plain_text", "text": "Team Progress Log"},
-                "submit": {"type": "plain_text", "text": "Submit"},
-                "close": {"type": "plain_text", "text": "Close"},
-                "private_metadata": json.dumps({"channel_id": channel_id}),
-                "blocks": [
-                    {
-                        "type": "section",
-                        "text": {"type": "mrkdwn", "text": "*Let’s capture this week’s wins, challenges, and team progress below. 👇*"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "start_date",
-                        "element": {
-                            "type": "datepicker",
-                            "action_id": "start_date_picker",
-                            "placeholder": {"type": "plain_text", "text": "Select start date"}
-                        },
-                        "label": {"type": "plain_text", "text": "Start of Week"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "end_date",
-                        "element": {
-                            "type": "datepicker",
-                            "action_id": "end_date_picker",
-                            "placeholder": {"type": "plain_text", "text": "Select end date"}
-                        },
-                        "label": {"type": "plain_text", "text": "End of Week"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "top_performers",
-                        "element": {
-                            "type": "multi_static_select",
-                            "action_id": "top_performers_select",
-                            "placeholder": {"type": "plain_text", "text": "Select top performers"},
-                            "options": employee_options
-                        },
-                        "label": {"type": "plain_text", "text": "Top Performers"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "top_support",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "top_support_input",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "How are you supporting top performers?"}
-                        },
-                        "label": {"type": "plain_text", "text": "Support Actions for Top Performers"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "bottom_performers",
-                        "element": {
-                            "type": "multi_static_select",
-                            "action_id": "bottom_performers_select",
-                            "placeholder": {"type": "plain_text", "text": "Select bottom performers"},
-                            "options": employee_options
-                        },
-                        "label": {"type": "plain_text", "text": "Bottom Performers"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "bottom_actions",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "bottom_actions_input",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "Describe coaching, follow-up, etc."}
-                        },
-                        "label": {"type": "plain_text", "text": "Support Actions for Bottom Performers"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "improvement_plan",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "improvement_plan_input",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "Are they improving? What's the plan?"}
-                        },
-                        "label": {"type": "plain_text", "text": "Improvement Plan"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "team_momentum",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "team_momentum_input",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "Are you rising together or are there support gaps?"}
-                        },
-                        "label": {"type": "plain_text", "text": "Team Momentum"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "trends",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "trends_input",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "Any recurring behaviors, client feedback, or performance shifts?"}
-                        },
-                        "label": {"type": "plain_text", "text": "Trends"}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "additional_notes",
-                        "optional": True,
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "notes_input",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "Shoutouts, observations, anything else to share?"}
-                        },
-                        "label": {"type": "plain_text", "text": "Additional Notes"}
-                    }
-                ]
-            }
-        }
+
         logger.info("Opening modal for weekly update form")
-        response = session.post("https://slack.com/api/views.open", headers=headers, json=modal)
-        logger.info(f"Slack API response status: {response.status_code}")
-        logger.info(f"Slack API response: {response.text}")
-        if response.status_code != 200 or not response.json().get("ok"):
+        response = session.post("https://slack.com/api/views.open", data=weekly_update_view_body(trigger_id, channel_id), timeout=SLACK_TIMEOUT)
+        logger.info("Slack API response status: %s", response.status_code)
+        logger.debug("Slack API response: %s", response.text)
+        if response.status_code != 200 or not orjson.loads(response.content).get("ok"):
             logger.error(f"Failed to open modal: {response.text}")
-            error_blocks = [
-                {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to open weekly update modal: {response.text}"}}
-            ]
-            session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
+            post_bot_error(f"Failed to open weekly update modal: {response.text}")
         else:
             logger.info("Modal request sent to Slack successfully")
         return "", 200
@@ -1091,380 +1515,404 @@ def slack_command_weekly_update_form():
         return "Internal server error", 500
 
 # ========== SLACK INTERACTIONS AND VIEW SUBMISSIONS ==========
+# Follow-up modal: the header section names the agent/state per click, the rest is static
+FOLLOWUP_VIEW = {
+    "type": "modal",
+    "callback_id": "followup_submit",
+    "title": {"type": "plain_text", "text": "Follow-Up"},
+    "submit": {"type": "plain_text", "text": "Submit"},
+    "close": {"type": "plain_text", "text": "Close"}
+}
+
+FOLLOWUP_INPUT_BLOCKS = [
+    {
+        "type": "input",
+        "block_id": "monitoring",
+        "element": {
+            "type": "static_select",
+            "placeholder": {"type": "plain_text", "text": "Select an option"},
+            "options": [
+                {"text": {"type": "plain_text", "text": "Listen In"}, "value": "listen_in"},
+                {"text": {"type": "plain_text", "text": "Coach"}, "value": "coach"},
+                {"text": {"type": "plain_text", "text": "Join"}, "value": "join"},
+                {"text": {"type": "plain_text", "text": "None"}, "value": "none"}
+            ],
+            "action_id": "monitoring_method"
+        },
+        "label": {"type": "plain_text", "text": "Monitoring Method"}
+    },
+    {
+        "type": "input",
+        "block_id": "action",
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "action_taken",
+            "multiline": True,
+            "placeholder": {"type": "plain_text", "text": "e.g. Coached agent, verified call handling"}
+        },
+        "label": {"type": "plain_text", "text": "What did you do?"}
+    },
+    {
+        "type": "input",
+        "block_id": "reason",
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "reason_for_issue",
+            "multiline": True,
+            "placeholder": {"type": "plain_text", "text": "e.g. Client had multiple questions"}
+        },
+        "label": {"type": "plain_text", "text": "Reason for issue"}
+    },
+    {
+        "type": "input",
+        "block_id": "notes",
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "additional_notes",
+            "multiline": True,
+            "placeholder": {"type": "plain_text", "text": "Optional comments"}
+        },
+        "label": {"type": "plain_text", "text": "Additional notes"}
+    }
+]
+
+# Fields packed into alert/follow-up button values as "kind|agent|interaction_id|agent_state|duration_min|original_timestamp|campaign"
+ButtonValue = namedtuple("ButtonValue", ["kind", "agent", "interaction_id", "agent_state", "duration_min", "original_timestamp", "campaign"])
+
+def parse_button_value(value):
+    """Split a pipe-delimited button value; approval and not-approved buttons carry fewer fields, so missing ones get defaults."""
+    parts = value.split("|", 6)
+    parts += [None] * (7 - len(parts))
+    kind, agent, interaction_id, agent_state, duration_min, original_timestamp, campaign = parts
+    return ButtonValue(
+        kind, agent, interaction_id, agent_state,
+        float(duration_min) if duration_min else 0.0,
+        parse_event_timestamp(original_timestamp) if original_timestamp else None,
+        campaign or "Unknown Campaign"
+    )
+
+def process_followup_submission(payload):
+    """Log a submitted follow-up modal and post the resolution in the alert thread (runs on background_executor)."""
+    try:
+        logger.info("Handling followup_submit")
+        values = payload["view"]["state"]["values"]
+        metadata = orjson.loads(payload["view"]["private_metadata"])
+        agent = metadata["agent"]
+        interaction_id = metadata["interaction_id"]
+        agent_state = metadata["agent_state"]
+        duration_min = float(metadata["duration_min"])
+        user = metadata["user"]
+        monitoring = values["monitoring"]["monitoring_method"]["selected_option"]["value"]
+        action = values["action"]["action_taken"]["value"]
+        reason = values["reason"]["reason_for_issue"]["value"]
+        notes = values["notes"]["additional_notes"]["value"]
+        original_timestamp = parse_event_timestamp(metadata["original_timestamp"])
+        campaign = metadata["campaign"]
+
+        # Log the follow-up submission to the spreadsheet
+        log_to_followups(
+            agent=agent,
+            timestamp=original_timestamp,  # Use the original timestamp from the event
+            duration_min=duration_min,
+            interaction_id=interaction_id,
+            agent_state=agent_state,
+            campaign=campaign,
+            user=user,
+            monitoring=monitoring,
+            action=action,
+            reason=reason,
+            notes=notes,
+            status="Resolved"
+        )
+        logger.info(f"Logged follow-up submission for {agent}: {agent_state}")
+
+        # Post a resolved message to Slack
+        resolved_message = f"✅ Follow-up for {agent} ({agent_state}) has been resolved by @{user}."
+        resolved_blocks = [
+            {"type": "section", "text": {"type": "mrkdwn", "text": resolved_message}}
+        ]
+        post_slack_message(ALERT_CHANNEL_ID, resolved_blocks, thread_ts=metadata["thread_ts"])
+    except Exception as e:
+        logger.error(f"ERROR in process_followup_submission: {e}")
+
+# Header row written to every new weekly update tab
+WEEKLY_UPDATE_HEADERS = (
+    "Timestamp (UTC)", "Submitted By", "Top Performers", "Support Actions",
+    "Bottom Performers", "Action Plans", "Improvement Plan", "Team Momentum", "Trends", "Additional Notes"
+)
+
+# Free-text weekly update blocks that must contain more than whitespace
+WEEKLY_UPDATE_REQUIRED_TEXT = ("top_support", "bottom_actions", "improvement_plan", "team_momentum", "trends")
+
+def view_fields(payload):
+    """Map each input block_id of a submitted view to its element state (every input block holds a single element)."""
+    return {block_id: next(iter(elements.values())) for block_id, elements in payload["view"]["state"]["values"].items()}
+
+def validate_weekly_update(fields):
+    """Return Slack response_action errors keyed by block_id; empty when the submission can be logged."""
+    errors = {
+        block_id: "This field is required"
+        for block_id in WEEKLY_UPDATE_REQUIRED_TEXT
+        if not (fields.get(block_id, {}).get("value") or "").strip()
+    }
+    start_str = fields.get("start_date", {}).get("selected_date")
+    end_str = fields.get("end_date", {}).get("selected_date")
+    if start_str and end_str and end_str < start_str:
+        errors["end_date"] = "End date must be on or after the start date"
+    return errors
+
+def process_weekly_update_submission(payload):
+    """Log a submitted weekly update to its sheet and post the summary to Slack (runs on background_executor)."""
+    try:
+        logger.info("Handling weekly_update_modal submission")
+        fields = view_fields(payload)
+        try:
+            start_date = parse_picker_date(fields["start_date"]["selected_date"])
+            end_date = parse_picker_date(fields["end_date"]["selected_date"])
+        except Exception as e:
+            logger.error(f"Failed to parse dates: {e}")
+            post_bot_error("Failed to process weekly update submission: Invalid date format. Please try again.")
+            return
+
+        top_performers = [EMPLOYEE_NAMES.get(option["value"]) or option["value"].replace("_", " ").title() for option in fields["top_performers"]["selected_options"]]
+        top_support = fields["top_support"]["value"]
+        bottom_performers = [EMPLOYEE_NAMES.get(option["value"]) or option["value"].replace("_", " ").title() for option in fields["bottom_performers"]["selected_options"]]
+        bottom_actions = fields["bottom_actions"]["value"]
+        improvement_plan = fields["improvement_plan"]["value"]
+        team_momentum = fields["team_momentum"]["value"]
+        trends = fields["trends"]["value"]
+        additional_notes = fields["additional_notes"]["value"] if "additional_notes" in fields else ""
+
+        user = payload["user"]["username"].replace(".", " ").title()
+        week = f"{format_month_day(start_date)} - {format_month_day(end_date)}"
+
+        # Post the summary to Slack
+        summary_sections = [
+            f"*Top Performers:*\n{', '.join(top_performers)}\n*Support Actions:*\n{top_support}",
+            f"*Bottom Performers:*\n{', '.join(bottom_performers)}\n*Support Actions:*\n{bottom_actions}",
+            f"*Improvement Plan:*\n{improvement_plan}",
+            f"*Team Momentum:*\n{team_momentum}",
+            f"*Trends:*\n{trends}",
+            f"*Additional Notes:*\n{additional_notes}" if additional_notes else "*Additional Notes:*\nNone"
+        ]
+        # One section renders the same as six; Slack caps section text at 3000 chars, so long updates keep one per field
+        summary_text = "\n".join(summary_sections)
+        section_texts = [summary_text] if len(summary_text) <= 3000 else summary_sections
+        summary_blocks = [
+            {"type": "header", "text": {"type": "plain_text", "text": f"📈 Team Progress Log – {week}"}},
+            {"type": "section", "text": {"type": "mrkdwn", "text": f"*Submitted by:* {user}"}}
+        ] + [{"type": "section", "text": {"type": "mrkdwn", "text": text}} for text in section_texts]
+        # The success confirmation rides along as a context block instead of a second post
+        success_message = f"✅ Weekly update for {week} submitted successfully by {user}!"
+        summary_blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": success_message}]})
+        # The Slack post doesn't depend on the Sheets service lookup, so don't make it wait
+        background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, summary_blocks)
+
+        # Log to Google Sheet (WEEKLY_UPDATE_SHEET_ID)
+        year = start_date.year
+        sheets_service_info = get_sheets_service(year, sheet_type="weekly_update")
+        if sheets_service_info:
+            sheets_service, spreadsheet_id = sheets_service_info
+            sheet_name = f"Weekly {week}"
+            try:
+                rows = [[
+                    datetime.now(UTC).isoformat(), user, ", ".join(top_performers), top_support,
+                    ", ".join(bottom_performers), bottom_actions, improvement_plan, team_momentum, trends, additional_notes
+                ]]
+                queue_sheet_rows(sheets_service, spreadsheet_id, sheet_name, WEEKLY_UPDATE_HEADERS, rows)
+                logger.info(f"Queued weekly update row for Google Sheet: {sheet_name} for year {year}")
+            except Exception as e:
+                logger.error(f"Failed to log weekly update to Google Sheet: {e}")
+                post_bot_error(f"Failed to log weekly update to Google Sheet (sheet: {sheet_name}): {str(e)}")
+        else:
+            logger.warning(f"Could not log to Google Sheets for year {year} (weekly_update)")
+            post_bot_error(f"Could not log weekly update to Google Sheets for year {year} (weekly_update).")
+    except Exception as e:
+        logger.error(f"ERROR in process_weekly_update_submission: {e}")
+
+def _handle_assign(payload, user):
+    """Post the investigating notice and Follow-Up button in the alert thread."""
+    value = payload["actions"][0]["value"]
+    _, agent, interaction_id, agent_state, duration_min, original_timestamp, campaign = parse_button_value(value)
+    thread_ts = payload["message"]["ts"]
+    blocks = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"🔍 @{user} is investigating this {agent_state} alert for {agent}."}},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "📝 Follow-Up"}, "value": f"followup|{agent}|{interaction_id}|{agent_state}|{duration_min}|{original_timestamp.isoformat()}|{campaign}", "action_id": "open_followup"}
+        ]}
+    ]
+    background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
+    # Optional: Remove the log_to_followups call here if logging should only happen after follow-up.
+    # ...existing code...
+
+def _handle_approve(payload, user):
+    """Confirm a management approval in the alert thread and log it as resolved."""
+    value = payload["actions"][0]["value"]
+    _, agent, campaign, agent_state, *_ = parse_button_value(value)
+    thread_ts = payload["message"]["ts"]
+    blocks = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"✅ *{agent_state} Approved*\nAgent: {agent}\nApproved by: @{user}\nInteraction ID: {campaign}"}}
+    ]
+    background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
+
+    # Log the approval to the weekly tab
+    background_executor.submit(
+        log_to_followups,
+        agent=agent,
+        timestamp=datetime.now(UTC),
+        duration_min=0,
+        interaction_id=campaign,
+        agent_state=agent_state,
+        campaign=campaign,
+        user=user,
+        approval_decision="Approved",
+        approved_by=user,
+        status="Resolved"
+    )
+    logger.info(f"Logged approval for {agent}: {agent_state}")
+
+def _handle_not_approve(payload, user):
+    """Post a Follow-Up button for a declined approval and log it as assigned."""
+    value = payload["actions"][0]["value"]
+    _, agent, campaign, agent_state, *_ = parse_button_value(value)
+    thread_ts = payload["message"]["ts"]
+    blocks = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"🔍 @{user} is investigating this {agent_state} alert for {agent}."}},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "📝 Follow-Up"}, "value": f"followup|{agent}|{campaign}|{agent_state}|0", "action_id": "open_followup"}
+        ]}
+    ]
+    background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
+
+    # Log the non-approval to the weekly tab
+    background_executor.submit(
+        log_to_followups,
+        agent=agent,
+        timestamp=datetime.now(UTC),
+        duration_min=0,
+        interaction_id=campaign,
+        agent_state=agent_state,
+        campaign=campaign,
+        user=user,
+        approval_decision="Not Approved",
+        approved_by=user,
+        status="Assigned"
+    )
+    logger.info(f"Logged non-approval for {agent}: {agent_state}")
+
+def _handle_copy_interaction_id(payload, user):
+    """Echo the interaction ID into the alert thread so it can be copied."""
+    value = payload["actions"][0]["value"]
+    thread_ts = payload["message"]["ts"]
+    blocks = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"📋 Interaction ID `{value}` - Please copy it manually from here."}}
+    ]
+    background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
+    logger.info(f"User {user} requested to copy Interaction ID: {value}")
+
+def _handle_open_followup(payload, user):
+    """Open the follow-up modal for an alert, falling back to a thread notice if Slack refuses."""
+    logger.info("Handling open_followup action for user: %s", user)
+    value = payload["actions"][0]["value"]
+    logger.debug("Button value: %s", value)
+    try:
+        _, agent, interaction_id, agent_state, duration_min, original_timestamp, campaign = parse_button_value(value)
+    except ValueError as e:
+        logger.error(f"Failed to parse button value '{value}': {e}")
+        background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, FOLLOWUP_PARSE_ERROR_BLOCKS, thread_ts=payload["message"]["ts"])
+        return
+
+    # Follow-ups raised from a "Not Approved" decision carry no event time
+    original_timestamp = original_timestamp or datetime.now(UTC)
+    trigger_id = payload["trigger_id"]
+    thread_ts = payload["message"]["ts"]
+    logger.debug("Trigger ID: %s", trigger_id)
+
+    modal = {
+        "trigger_id": trigger_id,
+        "view": {
+            **FOLLOWUP_VIEW,
+            "blocks": [
+                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Follow-Up for {agent} - {agent_state} Alert*"}},
+                *FOLLOWUP_INPUT_BLOCKS
+            ],
+            "private_metadata": orjson.dumps({
+                "agent": agent,
+                "interaction_id": interaction_id,
+                "agent_state": agent_state,
+                "duration_min": duration_min,
+                "user": user,
+                "thread_ts": thread_ts,
+                "original_timestamp": original_timestamp.isoformat(),
+                "campaign": campaign
+            }).decode()
+        }
+    }
+
+    logger.info(f"Sending views.open request to Slack with modal")
+    try:
+        response = session.post("https://slack.com/api/views.open", data=orjson.dumps(modal), timeout=SLACK_TIMEOUT)
+        logger.info("Slack API response status: %s", response.status_code)
+        logger.debug("Slack API response: %s", response.text)
+        result = orjson.loads(response.content) if response.status_code == 200 else {}
+        if not result.get("ok"):
+            error_message = result.get("error", "Unknown error")
+            logger.error(f"Failed to open follow-up modal: {response.text}")
+            if error_message == "invalid_trigger":
+                logger.error("Trigger ID expired or invalid. Ensure the button is clicked within 30 seconds.")
+            elif error_message == "missing_scope":
+                logger.error("Missing modals:write scope. Check Slack bot token scopes.")
+            fallback_blocks = warning_blocks(f"Failed to open follow-up modal for {agent}. Error: {error_message}. Please try again or use a manual form.")
+            background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, fallback_blocks, thread_ts=thread_ts)
+            post_bot_error(f"Failed to open follow-up modal for {agent}: {response.text}")
+        else:
+            logger.info("Follow-up modal request sent to Slack successfully")
+    except Exception as e:
+        logger.error(f"ERROR: Failed to open follow-up modal: {e}")
+        fallback_blocks = warning_blocks(f"Failed to open the follow-up modal for {agent}. Error: {str(e)}. Please use a manual form to submit your follow-up.")
+        background_executor.submit(post_slack_message, ALERT_CHANNEL_ID, fallback_blocks, thread_ts=thread_ts)
+        post_bot_error(f"Failed to open follow-up modal for {agent}: {str(e)}")
+
+# block_actions action_id -> handler(payload, user). Slack wants an answer within 3 seconds, so handlers hand
+# their thread replies to background_executor rather than waiting on the paced chat.postMessage queue.
+ACTION_HANDLERS = {
+    "assign_to_me": _handle_assign,
+    "approve_event": _handle_approve,
+    "not_approve_event": _handle_not_approve,
+    "copy_interaction_id": _handle_copy_interaction_id,
+    "open_followup": _handle_open_followup
+}
+
 @app.route("/slack/interactions", methods=["POST"])
 def slack_interactions():
-    current_time_et = datetime.utcnow().replace(tzinfo=pytz.UTC).astimezone(ET)
-    logger.info(f"Received request to /slack/interactions at {current_time_et.isoformat()}")
+    logger.info("Received request to /slack/interactions")
     try:
-        payload = json.loads(request.form["payload"])
-        logger.debug(f"Interactivity payload: {json.dumps(payload, indent=2)}")
+        payload = orjson.loads(request.form["payload"])
+        logger.debug("Interactivity payload: %s", LazyJson(payload))
 
         if payload["type"] == "block_actions":
             action_id = payload["actions"][0]["action_id"]
             user = payload["user"]["username"].replace(".", " ").title()
-            response_url = payload["response_url"]
-
-            if action_id == "assign_to_me":
-                value = payload["actions"][0]["value"]
-                _, agent, interaction_id, agent_state, duration_min, original_timestamp, campaign = value.split("|")
-                duration_min = float(duration_min)
-                original_timestamp = parse(original_timestamp).replace(tzinfo=pytz.UTC)
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"🔍 @{user} is investigating this {agent_state} alert for {agent}."}},
-                    {"type": "actions", "elements": [
-                        {"type": "button", "text": {"type": "plain_text", "text": "📝 Follow-Up"}, "value": f"followup|{agent}|{interaction_id}|{agent_state}|{duration_min}|{original_timestamp.isoformat()}|{campaign}", "action_id": "open_followup"}
-                    ]}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
-                # Optional: Remove the log_to_followups call here if logging should only happen after follow-up.
-                # ...existing code...
-
-            elif action_id == "approve_event":
-                value = payload["actions"][0]["value"]
-                _, agent, campaign, agent_state = value.split("|")
-                thread_ts = payload["message"]["ts"]
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"✅ *{agent_state} Approved*\nAgent: {agent}\nApproved by: @{user}\nInteraction ID: {campaign}"}}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
-
-                # Log the approval to the weekly tab
-                year = datetime.utcnow().year
-                team = agent_teams.get(agent, "Unknown Team")
-                log_to_followups(
-                    agent=agent,
-                    timestamp=datetime.utcnow().replace(tzinfo=pytz.UTC),
-                    duration_min=0,
-                    interaction_id=campaign,
-                    agent_state=agent_state,
-                    campaign=campaign,
-                    user=user,
-                    approval_decision="Approved",
-                    approved_by=user,
-                    status="Resolved"
-                )
-                logger.info(f"Logged approval for {agent}: {agent_state}")
-
-            elif action_id == "not_approve_event":
-                value = payload["actions"][0]["value"]
-                _, agent, campaign, agent_state = value.split("|")
-                thread_ts = payload["message"]["ts"]
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"🔍 @{user} is investigating this {agent_state} alert for {agent}."}},
-                    {"type": "actions", "elements": [
-                        {"type": "button", "text": {"type": "plain_text", "text": "📝 Follow-Up"}, "value": f"followup|{agent}|{campaign}|{agent_state}|0", "action_id": "open_followup"}
-                    ]}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
-
-                # Log the non-approval to the weekly tab
-                year = datetime.utcnow().year
-                team = agent_teams.get(agent, "Unknown Team")
-                log_to_followups(
-                    agent=agent,
-                    timestamp=datetime.utcnow().replace(tzinfo=pytz.UTC),
-                    duration_min=0,
-                    interaction_id=campaign,
-                    agent_state=agent_state,
-                    campaign=campaign,
-                    user=user,
-                    approval_decision="Not Approved",
-                    approved_by=user,
-                    status="Assigned"
-                )
-                logger.info(f"Logged non-approval for {agent}: {agent_state}")
-
-            elif action_id == "copy_interaction_id":
-                value = payload["actions"][0]["value"]
-                thread_ts = payload["message"]["ts"]
-                blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"📋 Interaction ID `{value}` - Please copy it manually from here."}}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, blocks, thread_ts=thread_ts)
-                logger.info(f"User {user} requested to copy Interaction ID: {value}")
 
-            elif action_id == "open_followup":
-                logger.info(f"Handling open_followup action for user: {user} at {datetime.utcnow().replace(tzinfo=pytz.UTC).astimezone(ET).isoformat()}")
-                value = payload["actions"][0]["value"]
-                logger.debug(f"Button value: {value}")
-                try:
-                    _, agent, interaction_id, agent_state, duration_min, original_timestamp, campaign = value.split("|")
-                    duration_min = float(duration_min)
-                    original_timestamp = parse(original_timestamp).replace(tzinfo=pytz.UTC)
-                except ValueError as e:
-                    logger.error(f"Failed to parse button value '{value}': {e}")
-                    fallback_blocks = [
-                        {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Error processing follow-up request for {agent}. Please try again."}}
-                    ]
-                    post_slack_message(ALERT_CHANNEL_ID, fallback_blocks, thread_ts=payload["message"]["ts"])
-                    return "", 200
-
-                trigger_id = payload["trigger_id"]
-                thread_ts = payload["message"]["ts"]
-                logger.debug(f"Trigger ID: {trigger_id}")
-
-                # Ensure headers is accessible
-                global headers
-                if not isinstance(headers, dict) or "Authorization" not in headers:
-                    logger.warning("Headers variable is missing or invalid, reinitializing...")
-                    headers = {
-                        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-                        "Content-Type": "application/json"
-                    }
-
-                modal = {
-                    "trigger_id": trigger_id,
-                    "view": {
-                        "type": "modal",
-                        "callback_id": "followup_submit",
-                        "title": {"type": "plain_text", "text": "Follow-Up"},
-                        "submit": {"type": "plain_text", "text": "Submit"},
-                        "close": {"type": "plain_text", "text": "Close"},
-                        "blocks": [
-                            {
-                                "type": "section",
-                                "text": {"type": "mrkdwn", "text": f"*Follow-Up for {agent} - {agent_state} Alert*"}
-                            },
-                            {
-                                "type": "input",
-                                "block_id": "monitoring",
-                                "element": {
-                                    "type": "static_select",
-                                    "placeholder": {"type": "plain_text", "text": "Select an option"},
-                                    "options": [
-                                        {"text": {"type": "plain_text", "text": "Listen In"}, "value": "listen_in"},
-                                        {"text": {"type": "plain_text", "text": "Coach"}, "value": "coach"},
-                                        {"text": {"type": "plain_text", "text": "Join"}, "value": "join"},
-                                        {"text": {"type": "plain_text", "text": "None"}, "value": "none"}
-                                    ],
-                                    "action_id": "monitoring_method"
-                                },
-                                "label": {"type": "plain_text", "text": "Monitoring Method"}
-                            },
-                            {
-                                "type": "input",
-                                "block_id": "action",
-                                "element": {
-                                    "type": "plain_text_input",
-                                    "action_id": "action_taken",
-                                    "multiline": True,
-                                    "placeholder": {"type": "plain_text", "text": "e.g. Coached agent, verified call handling"}
-                                },
-                                "label": {"type": "plain_text", "text": "What did you do?"}
-                            },
-                            {
-                                "type": "input",
-                                "block_id": "reason",
-                                "element": {
-                                    "type": "plain_text_input",
-                                    "action_id": "reason_for_issue",
-                                    "multiline": True,
-                                    "placeholder": {"type": "plain_text", "text": "e.g. Client had multiple questions"}
-                                },
-                                "label": {"type": "plain_text", "text": "Reason for issue"}
-                            },
-                            {
-                                "type": "input",
-                                "block_id": "notes",
-                                "element": {
-                                    "type": "plain_text_input",
-                                    "action_id": "additional_notes",
-                                    "multiline": True,
-                                    "placeholder": {"type": "plain_text", "text": "Optional comments"}
-                                },
-                                "label": {"type": "plain_text", "text": "Additional notes"}
-                            }
-                        ],
-                        "private_metadata": json.dumps({
-                            "agent": agent,
-                            "interaction_id": interaction_id,
-                            "agent_state": agent_state,
-                            "duration_min": duration_min,
-                            "user": user,
-                            "thread_ts": thread_ts,
-                            "original_timestamp": original_timestamp.isoformat(),
-                            "campaign": campaign
-                        })
-                    }
-                }
-
-                logger.info(f"Sending views.open request to Slack with modal")
-                for attempt in range(5):
-                    try:
-                        response = session.post("https://slack.com/api/views.open", headers=headers, json=modal)
-                        logger.info(f"Attempt {attempt + 1}: Slack API response status: {response.status_code}")
-                        logger.info(f"Attempt {attempt + 1}: Slack API response: {response.text}")
-                        if response.status_code == 429:
-                            retry_after = int(response.headers.get("Retry-After", 1))
-                            logger.warning(f"Rate-limited by Slack, retrying after {retry_after} seconds")
-                            time.sleep(retry_after)
-                            continue
-                        if response.status_code != 200 or not response.json().get("ok"):
-                            error_message = response.json().get("error", "Unknown error")
-                            logger.error(f"Failed to open follow-up modal: {response.text}")
-                            if error_message == "invalid_trigger":
-                                logger.error("Trigger ID expired or invalid. Ensure the button is clicked within 30 seconds.")
-                            elif error_message == "missing_scope":
-                                logger.error("Missing modals:write scope. Check Slack bot token scopes.")
-                            fallback_blocks = [
-                                {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to open follow-up modal for {agent}. Error: {error_message}. Please try again or use a manual form."}}
-                            ]
-                            post_slack_message(ALERT_CHANNEL_ID, fallback_blocks, thread_ts=thread_ts)
-                            error_blocks = [
-                                {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to open follow-up modal for {agent}: {response.text}"}}
-                            ]
-                            session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
-                            break
-                        logger.info("Follow-up modal request sent to Slack successfully")
-                        break
-                    except Exception as e:
-                        logger.error(f"ERROR: Failed to open follow-up modal: {e}")
-                        if attempt < 4:
-                            time.sleep(2 ** attempt)
-                            continue
-                        fallback_blocks = [
-                            {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to open the follow-up modal for {agent}. Error: {str(e)}. Please use a manual form to submit your follow-up."}}
-                        ]
-                        post_slack_message(ALERT_CHANNEL_ID, fallback_blocks, thread_ts=thread_ts)
-                        error_blocks = [
-                            {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to open follow-up modal for {agent}: {str(e)}"}}
-                        ]
-                        session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
-                return "", 200
+            handler = ACTION_HANDLERS.get(action_id)
+            if handler:
+                handler(payload, user)
 
         elif payload["type"] == "view_submission":
             callback_id = payload["view"]["callback_id"]
             logger.info(f"Processing view submission with callback_id: {callback_id}")
 
+            # Slack gives view submissions 3 seconds; Sheets writes and Slack posts happen after we respond
             if callback_id == "followup_submit":
-                logger.info("Handling followup_submit")
-                values = payload["view"]["state"]["values"]
-                metadata = json.loads(payload["view"]["private_metadata"])
-                agent = metadata["agent"]
-                interaction_id = metadata["interaction_id"]
-                agent_state = metadata["agent_state"]
-                duration_min = float(metadata["duration_min"])
-                user = metadata["user"]
-                monitoring = values["monitoring"]["monitoring_method"]["selected_option"]["value"]
-                action = values["action"]["action_taken"]["value"]
-                reason = values["reason"]["reason_for_issue"]["value"]
-                notes = values["notes"]["additional_notes"]["value"]
-                original_timestamp = parse(metadata["original_timestamp"]).replace(tzinfo=pytz.UTC)
-                campaign = metadata["campaign"]
-
-                # Log the follow-up submission to the spreadsheet
-                year = datetime.utcnow().year
-                team = agent_teams.get(agent, "Unknown Team")
-                log_to_followups(
-                    agent=agent,
-                    timestamp=original_timestamp,  # Use the original timestamp from the event
-                    duration_min=duration_min,
-                    interaction_id=interaction_id,
-                    agent_state=agent_state,
-                    campaign=campaign,
-                    user=user,
-                    monitoring=monitoring,
-                    action=action,
-                    reason=reason,
-                    notes=notes,
-                    status="Resolved"
-                )
-                logger.info(f"Logged follow-up submission for {agent}: {agent_state}")
-
-                # Post a resolved message to Slack
-                resolved_message = f"✅ Follow-up for {agent} ({agent_state}) has been resolved by @{user}."
-                resolved_blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": resolved_message}}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, resolved_blocks, thread_ts=metadata["thread_ts"])
+                background_executor.submit(process_followup_submission, payload)
 
             elif callback_id == "weekly_update_modal":
-                logger.info("Handling weekly_update_modal submission")
-                values = payload["view"]["state"]["values"]
-                metadata = json.loads(payload["view"]["private_metadata"])
-                channel_id = metadata["channel_id"]
-                try:
-                    start_date = datetime.strptime(values["start_date"]["start_date_picker"]["selected_date"], "%Y-%m-%d")
-                    end_date = datetime.strptime(values["end_date"]["end_date_picker"]["selected_date"], "%Y-%m-%d")
-                except Exception as e:
-                    logger.error(f"Failed to parse dates: {e}")
-                    error_blocks = [
-                        {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to process weekly update submission: Invalid date format. Please try again."}}
-                    ]
-                    session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
-                    return jsonify({"response_action": "clear"}), 200
-
-                top_performers = [option["value"].replace("_", " ").title() for option in values["top_performers"]["top_performers_select"]["selected_options"]]
-                top_support = values["top_support"]["top_support_input"]["value"]
-                bottom_performers = [option["value"].replace("_", " ").title() for option in values["bottom_performers"]["bottom_performers_select"]["selected_options"]]
-                bottom_actions = values["bottom_actions"]["bottom_actions_input"]["value"]
-                improvement_plan = values["improvement_plan"]["improvement_plan_input"]["value"]
-                team_momentum = values["team_momentum"]["team_momentum_input"]["value"]
-                trends = values["trends"]["trends_input"]["value"]
-                additional_notes = values["additional_notes"]["notes_input"]["value"] if "additional_notes" in values else ""
-
-                user = payload["user"]["username"].replace(".", " ").title()
-                week = f"{start_date.strftime('%b %-d')} - {end_date.strftime('%b %-d')}"
-
-                # Log to Google Sheet (WEEKLY_UPDATE_SHEET_ID)
-                year = start_date.year
-                sheets_service_info = get_sheets_service(year, sheet_type="weekly_update")
-                if sheets_service_info:
-                    sheets_service, spreadsheet_id = sheets_service_info
-                    sheet_name = f"Weekly {week}"
-                    headers = [
-                        "Timestamp (UTC)", "Submitted By", "Top Performers", "Support Actions",
-                        "Bottom Performers", "Action Plans", "Improvement Plan", "Team Momentum", "Trends", "Additional Notes"
-                    ]
-                    try:
-                        get_or_create_sheet_with_headers(sheets_service, spreadsheet_id, sheet_name, headers)
-                        body = {
-                            "values": [[
-                                datetime.utcnow().isoformat(), user, ", ".join(top_performers), top_support,
-                                ", ".join(bottom_performers), bottom_actions, improvement_plan, team_momentum, trends, additional_notes
-                            ]]
-                        }
-                        sheets_service.spreadsheets().values().append(
-                            spreadsheetId=spreadsheet_id,
-                            range=f"'{sheet_name}'!A2",
-                            valueInputOption="USER_ENTERED",
-                            body=body
-                        ).execute()
-                        logger.info(f"Logged weekly update to Google Sheet: {sheet_name} for year {year}")
-                    except Exception as e:
-                        logger.error(f"Failed to log weekly update to Google Sheet: {e}")
-                        error_blocks = [
-                            {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Failed to log weekly update to Google Sheet (sheet: {sheet_name}): {str(e)}"}}
-                        ]
-                        session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
-                else:
-                    logger.warning(f"Could not log to Google Sheets for year {year} (weekly_update)")
-                    error_blocks = [
-                        {"type": "section", "text": {"type": "mrkdwn", "text": f"⚠️ Could not log weekly update to Google Sheets for year {year} (weekly_update)."}}
-                    ]
-                    session.post("https://slack.com/api/chat.postMessage", headers=headers, json={"channel": BOT_ERROR_CHANNEL_ID, "blocks": error_blocks})
-
-                # Post the summary to Slack
-                summary_blocks = [
-                    {"type": "header", "text": {"type": "plain_text", "text": f"📈 Team Progress Log – {week}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Submitted by:* {user}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Top Performers:*\n{', '.join(top_performers)}\n*Support Actions:*\n{top_support}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Bottom Performers:*\n{', '.join(bottom_performers)}\n*Support Actions:*\n{bottom_actions}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Improvement Plan:*\n{improvement_plan}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Team Momentum:*\n{team_momentum}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Trends:*\n{trends}"}},
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Additional Notes:*\n{additional_notes}" if additional_notes else "*Additional Notes:*\nNone"}}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, summary_blocks)
-
-                # Post the success message to ALERT_CHANNEL_ID
-                success_message = f"✅ Weekly update for {week} submitted successfully by {user}!"
-                success_blocks = [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": success_message}}
-                ]
-                post_slack_message(ALERT_CHANNEL_ID, success_blocks)
-
-                return jsonify({"response_action": "clear"}), 200
+                errors = validate_weekly_update(view_fields(payload))
+                if errors:
+                    logger.info(f"Rejected weekly update submission: {errors}")
+                    return _json_response({"response_action": "errors", "errors": errors}, 200)
+                background_executor.submit(process_weekly_update_submission, payload)
+                return _json_response({"response_action": "clear"}, 200)
 
         return "", 200
     except Exception as e: